@@ -0,0 +1,44 @@
+"""Benchmark decoding large ``/market`` payloads.
+
+Run from the repository root::
+
+    python benchmarks/bench_decode.py
+
+``text`` is the previous path (``response.json()`` decodes the body to a str
+first), ``bytes`` hands the raw body to the decoder directly.
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vio.synthetic import market
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def main() -> None:
+    for items, listings in ((50, 20), (200, 100), (500, 200)):
+        body = json.dumps(market(items=items, listings=listings)).encode()
+        cases = {
+            "json, text": lambda: json.loads(body.decode("utf-8")),
+            "json, bytes": lambda: json.loads(body),
+        }
+        if orjson is not None:
+            cases["orjson, bytes"] = lambda: orjson.loads(body)
+
+        print(f"payload: {len(body) / 1e6:.2f} MB ({items} items x {listings} listings per side)")
+        for name, fn in cases.items():
+            number = max(1, int(20 / (len(body) / 1e6 + 0.1)))
+            elapsed = min(timeit.repeat(fn, number=number, repeat=3)) / number
+            print(f"  {name:<14} {elapsed * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
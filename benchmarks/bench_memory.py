@@ -0,0 +1,63 @@
+"""Benchmark the memory held per Listing in a MarketInstance.
+
+Run from the repository root::
+
+    python benchmarks/bench_memory.py
+
+``before`` rebuilds the listings with the previous ``__dict__`` based layout,
+``after`` uses the ``__slots__`` based models shipped in :mod:`vio`.
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vio import Listing, RobloxUser
+from vio.Vio import _get_ids_from_market
+
+from vio.synthetic import market, roblox_user
+
+
+class DictListing:
+    """The layout of :class:`vio.Listing` before it used ``__slots__``."""
+
+    def __init__(self, data: dict, users: dict) -> None:
+        self._id = data["userID"]
+        self._user = users.get(self._id)
+        self._volume = data["amount"]
+        self._price = data["price"]
+
+
+def bytes_per_listing(cls, orders: list, users: dict) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    built = [cls(o, users=users) for o in orders]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del built
+    return used / len(orders)
+
+
+def main() -> None:
+    data = market(items=100, listings=500, vendors=10_000)
+    users = {i: RobloxUser(roblox_user(i)) for i in _get_ids_from_market(data)}
+    orders = [
+        o
+        for item in data["data"]["marketInfo"].values()
+        for side in item["listings"].values()
+        for o in side
+    ]
+
+    before = bytes_per_listing(DictListing, orders, users)
+    after = bytes_per_listing(Listing, orders, users)
+    print(f"listings: {len(orders)}")
+    print(f"before:   {before:.1f} bytes/listing")
+    print(f"after:    {after:.1f} bytes/listing")
+
+
+if __name__ == "__main__":
+    main()
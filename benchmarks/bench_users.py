@@ -0,0 +1,42 @@
+"""Benchmark building a MarketInstance with vendor-to-user resolution.
+
+Run from the repository root::
+
+    python benchmarks/bench_users.py
+
+The time per listing should stay flat as the market grows.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vio import MarketInstance, RobloxUser
+from vio.Vio import _get_ids_from_market
+
+from vio.synthetic import market, roblox_user
+
+
+def bench(listings: int, items: int = 100) -> float:
+    # Half of the listings are buy orders, half sell orders.
+    per_side = listings // items // 2
+    vendors = max(listings // 10, 1)
+    data = market(items=items, listings=per_side, vendors=vendors)
+
+    start = time.perf_counter()
+    users = [RobloxUser(roblox_user(i)) for i in _get_ids_from_market(data)]
+    MarketInstance(data, users=users)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'listings':>10} {'seconds':>10} {'us/listing':>12}")
+    for listings in (12_500, 25_000, 50_000, 100_000):
+        elapsed = min(bench(listings) for _ in range(3))
+        print(f"{listings:>10} {elapsed:>10.3f} {elapsed / listings * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Run the benchmark suite and write the results as JSON.
+
+Run from the repository root::
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --items 200 --listings 50 --compare results.json
+
+Every case is run ``--repeat`` times on data from :class:`vio.SyntheticMarket`
+and the fastest run is used for ``per_second``. Runs with the same options and
+seed use the same payloads, so result files of two versions can be compared
+with ``--compare``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from vio import AsyncVio, Listing, MarketInstance, RateLimiter, RobloxUser, Vio
+from vio.Vio import _get_ids_from_market
+from vio.synthetic import SyntheticMarket
+
+
+def timed(fn, repeat: int, ops: int, unit: str) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+
+    best = min(runs)
+    return {
+        "best": best,
+        "mean": sum(runs) / len(runs),
+        "repeat": repeat,
+        "ops": ops,
+        "unit": unit,
+        "per_second": ops / best if best else None,
+    }
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def unlimited() -> RateLimiter:
+    return RateLimiter(rate=1e9, burst=10 ** 9)
+
+
+def bench_market_build(data: SyntheticMarket, repeat: int) -> dict:
+    payload = data.market()
+    users = {u.id: u for u in (RobloxUser(data.user(i)) for i in _get_ids_from_market(payload))}
+    listings = data.items * data.listings * 2
+
+    return {
+        "market_build": timed(lambda: MarketInstance(payload, users=users), repeat, listings, "listings"),
+        "market_build_lazy": timed(
+            lambda: MarketInstance(payload, users=users, lazy=True)["Item0"], repeat, listings, "listings"
+        ),
+    }
+
+
+def bench_listing_users(data: SyntheticMarket, repeat: int) -> dict:
+    payload = data.market()
+    users = {u.id: u for u in (RobloxUser(data.user(i)) for i in _get_ids_from_market(payload))}
+    orders = [
+        order
+        for item in payload["data"]["marketInfo"].values()
+        for side in ("buy", "sell")
+        for order in item["listings"][side]
+    ]
+
+    def run() -> None:
+        for order in orders:
+            Listing(order, users=users)
+
+    return {"listing_users": timed(run, repeat, len(orders), "listings")}
+
+
+def bench_item_history(data: SyntheticMarket, repeat: int) -> dict:
+    body = json.dumps(data.item_history("Item0")).encode()
+
+    def chunks():
+        # Arrive in pieces like a real response, so the streamed path splits across chunks.
+        for i in range(0, len(body), CHUNK_SIZE):
+            yield body[i:i + CHUNK_SIZE]
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=chunks()))
+
+    with Vio("bench", transport=transport, rate_limiter=unlimited()) as client:
+        return {
+            "item_history": timed(lambda: client.item_history("Item0"), repeat, data.history, "scans"),
+            "item_history_stream": timed(
+                lambda: list(client.iter_item_history("Item0")), repeat, data.history, "scans"
+            ),
+        }
+
+
+def bench_item_str(data: SyntheticMarket, repeat: int) -> dict:
+    items = list(MarketInstance(data.market(), query_users=False).items.values())
+
+    def run() -> None:
+        for item in items:
+            str(item)
+
+    return {"item_str": timed(run, repeat, len(items), "items")}
+
+
+def bench_listen_dispatch(data: SyntheticMarket, repeat: int) -> dict:
+    frames = [json.dumps(data.update(id)).encode() for id in data.ids()]
+
+    async def run() -> None:
+        # The same steps as AsyncVio.listen, without the socket.
+        client = AsyncVio("bench", rate_limiter=unlimited())
+
+        @client.event
+        async def on_market(market):
+            pass
+
+        @client.event(items=["Item0"])
+        async def on_item(item):
+            pass
+
+        @client.event(delta=True)
+        async def on_delta(delta):
+            pass
+
+        for frame in frames:
+            message = client._loads(frame)
+            instance = MarketInstance(message["DataType"], lazy=True)
+            client._market_cache.put(instance)
+            await client._deliver(instance)
+
+        await client.dispatcher.join()
+        await client.dispatcher.close()
+        await client.close()
+
+    return {"listen_dispatch": timed(lambda: asyncio.run(run()), repeat, len(frames), "updates")}
+
+
+BENCHMARKS = (
+    bench_market_build,
+    bench_listing_users,
+    bench_item_history,
+    bench_item_str,
+    bench_listen_dispatch,
+)
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, path: str) -> None:
+    with open(path) as f:
+        previous = json.load(f)["results"]
+
+    print(f"\ncompared to {path} (>1.00 is faster):")
+    for name, result in results.items():
+        old = previous.get(name)
+        if old is None or not result["best"]:
+            continue
+        ratio = old["best"] / result["best"]
+        flag = "  SLOWER" if ratio < 0.9 else ""
+        print(f"  {name:<22} {ratio:6.2f}x{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50, help="items per market")
+    parser.add_argument("--listings", type=int, default=20, help="buy and sell listings per item")
+    parser.add_argument("--vendors", type=int, default=500, help="distinct vendor ids")
+    parser.add_argument("--history", type=int, default=200, help="scans in an item history and the websocket feed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case")
+    parser.add_argument("--only", nargs="*", help="run only the benchmarks with these names, e.g. market_build")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="a previous JSON result file to compare with")
+    args = parser.parse_args()
+
+    data = SyntheticMarket(args.items, args.listings, args.vendors, args.history, args.seed)
+
+    results = {}
+    for bench in BENCHMARKS:
+        if args.only and bench.__name__[len("bench_"):] not in args.only:
+            continue
+        for name, result in bench(data, args.repeat).items():
+            results[name] = result
+            print(f"{name:<22} {result['best'] * 1e3:10.2f} ms  {result['per_second']:14,.0f} {result['unit']}/s")
+
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "items": args.items,
+            "listings": args.listings,
+            "vendors": args.vendors,
+            "history": args.history,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,10 @@ setup(
     "httpx==0.22.0",
     "terminaltables==3.1.10"
   ],
+  extras_require={
+    "numpy": ["numpy>=1.20"],
+    "speed": ["orjson"]
+  },
   classifiers=[
     'Development Status :: 1 - Planning',
     'License :: OSI Approved :: MIT License',  
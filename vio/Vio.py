@@ -26,34 +26,209 @@ SOFTWARE.
 import websockets
 import httpx
 import asyncio
+import hashlib
 import json
+import time
+import re
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from terminaltables import AsciiTable
 from itertools import zip_longest
 
+from .analytics import MarketScreen, OrderBook
+from .archive import ScanArchive
+from .backoff import Backoff
+from .cache import MarketCache, UserCache
+from .diff import ItemDelta, diff_items, diff_markets
+from .dispatch import Dispatcher, Overflow
+from .history import ItemHistory
+from .index import ScanIndex
+from .metrics import Metrics, _stage
+from .ratelimit import RateLimiter, endpoint
+
 from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
     Coroutine,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
     Union,
     List,
     Dict,
     Set
 )
 
+#: The HTTP API clients use unless given a ``base_url``.
 BASE_URI = "http://adv.vi-o.tech/api"
+#: The websocket feed :meth:`AsyncVio.listen` uses unless given a ``ws_url``.
 WS_URI = "ws://adv.vi-o.tech/ws"
 
+try:
+    from orjson import loads as _fast_loads
+except ImportError:
+    _fast_loads = None
+
+#: The JSON decoder clients use by default: ``orjson.loads`` when it is installed, else :func:`json.loads`.
+DEFAULT_JSON_LOADS: Callable[[Union[bytes, str]], Any] = _fast_loads or json.loads
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30.0)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+
 
 def _get_ids_from_market(data: dict) -> List[int]:
+    return _get_ids_from_markets([data])
+
+
+def _get_ids_from_markets(markets: Iterable[dict]) -> List[int]:
     ids = []
-    for i in data["data"]["marketInfo"].values():
-        for j in i["listings"].values():
-            for k in j:
-                if k["userID"] not in ids:
-                    ids.append(k["userID"])
+    seen = set()
+    for data in markets:
+        for i in data["data"]["marketInfo"].values():
+            for j in i["listings"].values():
+                for k in j:
+                    id = k["userID"]
+                    if id not in seen:
+                        seen.add(id)
+                        ids.append(id)
     return ids
 
 
+def _fingerprint(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def _retryable(error: Exception) -> bool:
+    # A missing or refused scan will not be there on the next try either.
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.HTTPError)
+
+
+def _index_users(users: Union[List["RobloxUser"], Dict[int, "RobloxUser"]]) -> Dict[int, "RobloxUser"]:
+    return users if isinstance(users, dict) else {u.id: u for u in users}
+
+
+def _build_markets(
+    payloads: Dict[int, Union[dict, "MarketInstance", Exception]],
+    cache: "MarketCache",
+    args: tuple,
+    kwargs: dict,
+    metrics: Optional["Metrics"] = None
+) -> Dict[int, Union["MarketInstance", Exception]]:
+    markets = {}
+    for id, payload in payloads.items():
+        if isinstance(payload, dict):
+            try:
+                with _stage(metrics, "build"):
+                    payload = MarketInstance(payload, *args, **kwargs)
+                cache.put(payload)
+            except Exception as e:
+                payload = e
+        markets[id] = payload
+    return markets
+
+
+# Regex building blocks for _JSONArraySplitter. Every pattern is written so
+# that each byte can only be consumed one way, which keeps failed matches linear.
+_JSON_PLAIN = rb'[^"\[\]{}]*'
+_JSON_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_JSON_NESTED = 8
+
+
+def _json_container(depth: int) -> bytes:
+    # An array or object nested at most ``depth`` levels deep. Brackets are not
+    # paired by kind, the decoder validates the element afterwards.
+    inner = _JSON_STRING
+    if depth > 1:
+        inner = rb"(?:" + _JSON_STRING + rb"|" + _json_container(depth - 1) + rb")"
+    return rb"[\[{]" + _JSON_PLAIN + rb"(?:" + inner + _JSON_PLAIN + rb")*[\]}]"
+
+
+class _JSONArraySplitter:
+    """Splits a streamed JSON array of objects or arrays into the raw bytes of each element.
+
+    Only the depth-1 boundaries are tracked. Every element that is complete in
+    the buffer is matched by a single regex call, so its braces and strings
+    are never looked at from Python; only an element cut off by the end of a
+    chunk (or nested deeper than the pattern) is walked bracket by bracket.
+    The buffer never holds more than one unfinished element.
+    """
+
+    _SKIP = re.compile(_JSON_PLAIN + rb"(?:" + _JSON_STRING + _JSON_PLAIN + rb")*")
+    _ELEMENT = re.compile(_json_container(_JSON_NESTED))
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._start = 0
+        self._opened = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        elements = []
+        if self._opened and self._depth == 0:
+            return elements
+
+        buffer = self._buffer
+        buffer += chunk
+
+        if not self._opened:
+            stripped = buffer.lstrip()
+            if not stripped:
+                return elements
+            if stripped[:1] != b"[":
+                raise ValueError("expected a JSON array")
+            self._opened = True
+            self._pos = len(buffer) - len(stripped) + 1
+            self._depth = 1
+
+        skip = self._SKIP.match
+        element = self._ELEMENT.match
+        pos, depth, start, end = self._pos, self._depth, self._start, len(buffer)
+        while True:
+            pos = skip(buffer, pos).end()
+            if pos >= end:
+                break
+
+            char = buffer[pos]
+            if char == 0x22:
+                # A string cut off by the end of the chunk.
+                break
+
+            if char == 0x7b or char == 0x5b:
+                if depth == 1:
+                    match = element(buffer, pos)
+                    if match is not None:
+                        elements.append(bytes(buffer[pos:match.end()]))
+                        pos = start = match.end()
+                        continue
+                    start = pos
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1:
+                    elements.append(bytes(buffer[start:pos + 1]))
+                    start = pos + 1
+                elif depth == 0:
+                    pos += 1
+                    break
+            pos += 1
+
+        self._depth = depth
+        if depth <= 1:
+            start = pos
+        del buffer[:start]
+        self._pos = pos - start
+        self._start = 0
+        return elements
+
+
 class RobloxUser:
     """Represents a Roblox user.
 
@@ -63,6 +238,8 @@ class RobloxUser:
             The user data.
     """
 
+    __slots__ = ("_id", "_name", "_display_name", "_url", "_tiny_url")
+
     def __init__(self, data: dict) -> None:
         self._id = data["_id"]
         self._name = data["name"]
@@ -106,6 +283,8 @@ class ItemSummary:
             The data of the summary.
     """
 
+    __slots__ = ("_buy_volume", "_buy_price", "_sell_volume", "_sell_price")
+
     def __init__(self, data: dict, *args, **kwargs) -> None:
         self._buy_volume: int = data["buy"].get("Volume", 0)
         self._buy_price: int = data["buy"].get("Best", 0)
@@ -155,9 +334,11 @@ class Listing:
             The data of the listing
     """
 
+    __slots__ = ("_id", "_user", "_volume", "_price")
+
     def __init__(self, data: dict, *args, **kwargs) -> None:
         self._id: int = data["userID"]
-        self._user: Union[RobloxUser, None] = next(iter([i for i in kwargs.get("users", None) if i.id == self._id]), None) if kwargs.get("users", None) else None
+        self._user: Union[RobloxUser, None] = _index_users(kwargs["users"]).get(self._id) if kwargs.get("users", None) else None
         self._volume: int = data["amount"]
         self._price: int = data["price"]
 
@@ -203,9 +384,14 @@ class ItemListings:
             A dictionary of the listings of an Item
     """
 
+    __slots__ = ("_buy", "_sell", "_book")
+
     def __init__(self, data: dict, *args, **kwargs) -> None:
+        if kwargs.get("users", None):
+            kwargs["users"] = _index_users(kwargs["users"])
         self._buy: List[Listing] = [Listing(i, *args, **kwargs) for i in data["buy"]]
         self._sell: List[Listing] = [Listing(i, *args, **kwargs) for i in data["sell"]]
+        self._book: Optional[OrderBook] = None
 
     def __repr__(self) -> str:
         return f"<{self.__class__}({self.buy=},{self.sell=})>"
@@ -229,6 +415,13 @@ class ItemListings:
     def sell(self) -> List[Listing]:
         """List[:class:`Listing`]: The sell listings of the Item"""
         return self._sell
+
+    @property
+    def book(self) -> OrderBook:
+        """:class:`OrderBook`: Depth and fill-cost queries over the listings, built on first use"""
+        if self._book is None:
+            self._book = OrderBook(self._buy, self._sell)
+        return self._book
     
 
 class ScanInfo:
@@ -240,6 +433,8 @@ class ScanInfo:
             A dictionary of the Scan Information.
     """
 
+    __slots__ = ("_unix", "_datetime")
+
     def __init__(self, data: dict, *args, **kwargs):
         self._unix: int = data["capturedTime"]
         self._datetime: datetime = datetime.strptime(data["datetimeSaved"]["$date"], "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
@@ -277,6 +472,8 @@ class ItemInstance:
             the scan information.
     """
 
+    __slots__ = ("_item", "_scan_info", "_listings", "_summary", "_has_users")
+
     def __init__(self, data: dict, item: str, scan_info: ScanInfo, *args, **kwargs) -> None:
         self._item: str = item
         self._scan_info: ScanInfo = scan_info
@@ -322,18 +519,42 @@ class MarketInstance:
     -----------
         data: :class:`dict`
             The data of the market.
+
+        lazy: :class:`bool`
+            Whether to keep the decoded data and only build an :class:`ItemInstance`
+            the first time an item is accessed. Defaults to ``False``.
     """
 
     def __init__(self, data: dict, *args, **kwargs) -> None:
+        if kwargs.get("users", None):
+            kwargs["users"] = _index_users(kwargs["users"])
         self._id: int = data["_id"]
+        self._has_users: bool = True if kwargs.get("users", None) else False
+        self._screen: Optional[MarketScreen] = None
         self._scan_info: ScanInfo = ScanInfo(data["data"]["scInfo"], *args, **kwargs)
-        self._items: Dict[str, ItemInstance] = {k: ItemInstance(v, k, self.scan_info, *args, **kwargs) for k, v in data["data"]["marketInfo"].items()}
+
+        if kwargs.get("lazy", False):
+            self._raw: Union[Dict[str, dict], None] = data["data"]["marketInfo"]
+            self._args = args
+            self._kwargs = kwargs
+            self._items: Dict[str, ItemInstance] = {}
+        else:
+            self._raw = None
+            self._items = {k: ItemInstance(v, k, self.scan_info, *args, **kwargs) for k, v in data["data"]["marketInfo"].items()}
 
     def __repr__(self) -> str:
         return f"<{self.__class__}({self.id=},{self.scan_info=},{self.items=})>"
     
     def __getitem__(self, item: str) -> Union[ItemInstance, None]:
-        return self.items.get(item, None)
+        if self._raw is None or item in self._items:
+            return self._items.get(item, None)
+
+        data = self._raw.get(item, None)
+        if data is None:
+            return None
+
+        instance = self._items[item] = ItemInstance(data, item, self.scan_info, *self._args, **self._kwargs)
+        return instance
 
     @property
     def id(self) -> int:
@@ -348,72 +569,361 @@ class MarketInstance:
     @property
     def items(self) -> Dict[str, ItemInstance]:
         """Dict[:class:`str`, :class:`ItemInstance`]: The items of the market"""
+        if self._raw is not None and len(self._items) != len(self._raw):
+            for item in self._raw:
+                self[item]
         return self._items
 
+    @property
+    def screen(self) -> MarketScreen:
+        """:class:`MarketScreen`: A table of every item's summary, built on first use. Requires ``numpy``."""
+        if self._screen is None:
+            self._screen = MarketScreen(self)
+        return self._screen
+
 class Vio:
     """ Represents an instance of the vio API, with a certain key.
 
+    Every request is sent through one long-lived :class:`httpx.Client`, so
+    connections are kept alive and reused between calls. Use the client as a
+    context manager, or call :meth:`close`, to release the connection pool.
+
     Parameters
     ----------
         key: :class:`str`
             The key of the vio API.
+
+        limits: Optional[:class:`httpx.Limits`]
+            The connection pool limits. Defaults to :data:`DEFAULT_LIMITS`.
+
+        timeout: Optional[:class:`httpx.Timeout`]
+            The request timeouts. Defaults to :data:`DEFAULT_TIMEOUT`.
+
+        transport: Optional[:class:`httpx.BaseTransport`]
+            A custom transport to send the requests through.
+            When given, ``limits`` is ignored.
+
+        user_cache: Optional[:class:`UserCache`]
+            The cache :meth:`get_users` serves users from. Defaults to a new :class:`UserCache`.
+
+        market_cache: Optional[:class:`MarketCache`]
+            The cache of fetched scans. Defaults to a new :class:`MarketCache`.
+
+        archive: Optional[:class:`ScanArchive`]
+            A local archive of raw scans. Once :meth:`sync` has run, scans and item
+            histories are read from it instead of the API. Scans published since
+            the last sync are stored before an item history is read from it, unless
+            the API cannot be reached.
+
+        json_loads: Optional[Callable[[Union[:class:`bytes`, :class:`str`]], Any]]
+            The function that decodes response bodies. It is given the raw bytes.
+            Defaults to :data:`DEFAULT_JSON_LOADS`.
+
+        rate_limiter: Optional[:class:`RateLimiter`]
+            Paces the requests and retries throttled or failed ones.
+            Defaults to a new :class:`RateLimiter`.
+
+        metrics: Optional[:class:`Metrics`]
+            Records request, parse and cache statistics. Nothing is recorded without it.
+
+        base_url: Optional[:class:`str`]
+            The root of the HTTP API, e.g. the :attr:`VioServer.base_url` of a local
+            stand-in. Defaults to :data:`BASE_URI`.
     """
 
-    def __init__(self, key: str) -> None:
+    def __init__(
+        self,
+        key: str,
+        *,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        user_cache: Optional[UserCache] = None,
+        market_cache: Optional[MarketCache] = None,
+        archive: Optional[ScanArchive] = None,
+        json_loads: Optional[Callable[[Union[bytes, str]], Any]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[Metrics] = None,
+        base_url: Optional[str] = None
+    ) -> None:
         self.key = key
         
         self._headers = {
             "X-API-KEY": self.key,
         }
-        
-        self._cached_market: Set[MarketInstance] = set()
+
+        self._http = httpx.Client(
+            base_url=base_url or BASE_URI,
+            headers=self._headers,
+            limits=limits or DEFAULT_LIMITS,
+            timeout=timeout or DEFAULT_TIMEOUT,
+            transport=transport
+        )
+
+        self._user_cache: UserCache = user_cache if user_cache is not None else UserCache()
+        self._market_cache: MarketCache = market_cache if market_cache is not None else MarketCache()
+        self._archive: Optional[ScanArchive] = archive
+        self._loads: Callable[[Union[bytes, str]], Any] = json_loads or DEFAULT_JSON_LOADS
+        self._rate_limiter: RateLimiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self._metrics: Optional[Metrics] = metrics
+        self._scan_index: ScanIndex = ScanIndex()
+        self._current_market: Optional[MarketInstance] = None
+        self._current_fingerprint: Optional[bytes] = None
+
+        if metrics is not None:
+            metrics.track_cache("users", self._user_cache)
+            metrics.track_cache("markets", self._market_cache)
+
+    def __enter__(self) -> "Vio":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection pool of the client."""
+        self._http.close()
+
+    @property
+    def user_cache(self) -> UserCache:
+        """:class:`UserCache`: The cache of users fetched by :meth:`get_users`."""
+        return self._user_cache
+
+    @property
+    def market_cache(self) -> MarketCache:
+        """:class:`MarketCache`: The cache of fetched scans, keyed by scan id."""
+        return self._market_cache
+
+    @property
+    def archive(self) -> Optional[ScanArchive]:
+        """Optional[:class:`ScanArchive`]: The local archive of raw scans, if any."""
+        return self._archive
+
+    @property
+    def scan_index(self) -> ScanIndex:
+        """:class:`ScanIndex`: The scans seen by :meth:`scan_history`, sorted by time."""
+        return self._scan_index
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """:class:`RateLimiter`: Paces and retries the requests of the client."""
+        return self._rate_limiter
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """Optional[:class:`Metrics`]: The statistics of the client, if it records any."""
+        return self._metrics
+
+    def _cached_scan(self, id: int, query_users: bool) -> Union[MarketInstance, None]:
+        market = self._market_cache.get(id)
+        if market is not None and (market._has_users or not query_users):
+            return market
+        return None
+
+    def _archive_current(self, refresh: bool) -> bool:
+        if self._archive is None or self._archive.synced is None:
+            return False
+
+        if refresh:
+            # Scans published since the last sync are not archived yet, store them first.
+            # Without the API the archived scans are still the best answer.
+            try:
+                self.refresh_scan_index()
+                missing = [id for id in self._scan_index.ids if id not in self._archive]
+                if missing:
+                    self._store_scans(missing)
+            except httpx.HTTPError:
+                pass
+        return True
+
+    def _archived_history(self, item: str, refresh: bool) -> Union[List[dict], None]:
+        if not self._archive_current(refresh):
+            return None
+        return self._archive.item_history(item)
+
+    def _unchanged_current(self, fingerprint: bytes, query_users: bool) -> Union[MarketInstance, None]:
+        market = self._current_market
+        if fingerprint == self._current_fingerprint and market is not None and (market._has_users or not query_users):
+            return market
+        return None
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        limiter = self._rate_limiter
+        metrics = self._metrics
+        backoff = limiter.backoff()
+        while True:
+            wait = limiter.acquire(path)
+            if wait > 0:
+                time.sleep(wait)
+
+            start = time.perf_counter()
+            res = self._http.request(method, path, **kwargs)
+            if metrics is not None:
+                metrics.record_request(
+                    method, path, res.status_code, time.perf_counter() - start,
+                    len(res.request.content), len(res.content)
+                )
+
+            delay = limiter.retry_delay(path, res, backoff)
+            if delay is None:
+                break
+            if metrics is not None:
+                metrics.inc("vio_request_retries_total", endpoint=endpoint(path))
+            time.sleep(delay)
+
+        res.raise_for_status()
+        return res
+
+    def _request_json(self, method: str, path: str, **kwargs) -> Any:
+        return self._decode(self._request(method, path, **kwargs).content)
+
+    def _decode(self, body: Union[bytes, str]) -> Any:
+        with _stage(self._metrics, "decode"):
+            return self._loads(body)
+
+    def _fetch_scan(self, id: int) -> dict:
+        if self._archive is not None:
+            data = self._archive.get(id)
+            if data is not None:
+                return data
+
+        data = self._request_json("GET", f"/market/{id}")
+        if self._archive is not None:
+            self._archive.put(data)
+        return data
 
     def current(self, *args, **kwargs) -> MarketInstance: 
         """Get the current market
 
+        When the response is byte for byte the one of the previous call, the
+        market built then is returned without decoding anything.
+
         :return: The current market.
         """
-        res = httpx.get(
-            f"{BASE_URI}/market",
-            headers=self._headers
-            ).json()
+        # Most polls return the scan we already built, so skip decoding it again.
+        body = self._request("GET", "/market").content
+        fingerprint = _fingerprint(body)
+        market = self._unchanged_current(fingerprint, kwargs.get("query_users", True))
+        if market is not None:
+            return market
+
+        res = self._decode(body)
+        if self._archive is not None:
+            self._archive.put(res)
 
         if kwargs.get("query_users", True):
             ids = _get_ids_from_market(res)
             all_users = self.get_users(ids)
             kwargs["users"] = all_users
 
-        self._latest_market = MarketInstance(res, *args, **kwargs)
-        if self._latest_market not in self._cached_market:
-            self._cached_market.add(self._latest_market)
+        with _stage(self._metrics, "build"):
+            self._latest_market = MarketInstance(res, *args, **kwargs)
+        self._market_cache.put(self._latest_market)
+        self._current_market = self._latest_market
+        self._current_fingerprint = fingerprint
 
         return self._latest_market
 
     def market_scan(self, id: int, *args, **kwargs) -> MarketInstance:
         """Get a market scan from a previous date.
 
+        Scans already in :attr:`market_cache` or :attr:`archive` are returned without a request.
+
         Returns
         -------
             :class:`MarketInstance`
         """
 
-        res = httpx.get(
-            f"{BASE_URI}/market/{id}",
-            headers=self._headers
-            ).json()
+        market = self._cached_scan(id, kwargs.get("query_users", True))
+        if market is not None:
+            return market
+
+        res = self._fetch_scan(id)
 
         if kwargs.get("query_users", True):
             ids = _get_ids_from_market(res)
             all_users = self.get_users(ids)
             kwargs["users"] = all_users
 
-        market = MarketInstance(res, *args, **kwargs)
-
-        if market not in self._cached_market:
-            self._cached_market.add(market)
+        with _stage(self._metrics, "build"):
+            market = MarketInstance(res, *args, **kwargs)
+        self._market_cache.put(market)
 
         return market
 
+    def market_scans(self, ids: Iterable[int], *args, concurrency: int = 8, **kwargs) -> List[Union[MarketInstance, Exception]]:
+        """Get many market scans concurrently, in the order of ``ids``.
+
+        The scans are fetched on a pool of ``concurrency`` threads, then the
+        users of the whole batch are looked up in one :meth:`get_users` call.
+        A scan that failed is returned as the exception it raised.
+
+        Parameters
+        ----------
+            ids: Iterable[:class:`int`]
+                The ids of the market scans to get.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+            query_users: :class:`bool`
+                Whether or not to query the users of the listings.
+
+        Returns
+        -------
+            List[Union[:class:`MarketInstance`, :class:`Exception`]]
+        """
+        ids = list(ids)
+        query_users = kwargs.get("query_users", True)
+
+        def fetch(id: int) -> Union[dict, MarketInstance, Exception]:
+            market = self._cached_scan(id, query_users)
+            if market is not None:
+                return market
+            try:
+                return self._fetch_scan(id)
+            except Exception as e:
+                return e
+
+        unique = list(dict.fromkeys(ids))
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            payloads = dict(zip(unique, pool.map(fetch, unique)))
+
+        if query_users:
+            kwargs["users"] = self.get_users(_get_ids_from_markets(p for p in payloads.values() if isinstance(p, dict)))
+
+        markets = _build_markets(payloads, self._market_cache, args, kwargs, self._metrics)
+        return [markets[id] for id in ids]
+
+    def iter_market_scans(self, ids: Iterable[int], *args, concurrency: int = 8, **kwargs) -> Iterator[Tuple[int, Union[MarketInstance, Exception]]]:
+        """Get many market scans concurrently, as they complete.
+
+        Each scan is fetched with :meth:`market_scan`, so its users are
+        resolved through :attr:`user_cache` rather than in a single batch.
+
+        Parameters
+        ----------
+            ids: Iterable[:class:`int`]
+                The ids of the market scans to get.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            Iterator[Tuple[:class:`int`, Union[:class:`MarketInstance`, :class:`Exception`]]]
+                The id of each scan with the scan, or the exception it raised.
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {pool.submit(self.market_scan, id, *args, **kwargs): id for id in dict.fromkeys(ids)}
+            try:
+                for future in as_completed(futures):
+                    error = future.exception()
+                    yield futures[future], future.result() if error is None else error
+            finally:
+                for future in futures:
+                    future.cancel()
+
     def scan_history(self) -> Dict[datetime, int]:
         """Get a dictionary of Datetimes to ints of the scan history.
 
@@ -422,12 +932,99 @@ class Vio:
             Dict[:class:`datetime`, :class:`int`]
         :return: A dictionary of Datetimes to ints of the scan history.
         """
-        res = httpx.get(
-            f"{BASE_URI}/market/history",
-            headers=self._headers
-            ).json()
+        res = self._request_json("GET", "/market/history")
+
+        history = {datetime.fromisoformat(k): v for k, v in res.items()}
+        self._scan_index.update(history)
+        return history
+
+    def refresh_scan_index(self) -> List[int]:
+        """Add the scans published since the last refresh to :attr:`scan_index`.
+
+        Returns
+        -------
+            List[:class:`int`]
+                The ids of the new scans, oldest first.
+        """
+        res = self._request_json("GET", "/market/history")
+
+        return self._scan_index.update({datetime.fromisoformat(k): v for k, v in res.items()})
 
-        return {datetime.fromisoformat(k): v for k, v in res.items()}
+    def market_scans_between(
+        self,
+        start: Optional[Union[int, datetime]],
+        end: Optional[Union[int, datetime]],
+        *args,
+        refresh: bool = True,
+        concurrency: int = 8,
+        **kwargs
+    ) -> List[Union[MarketInstance, Exception]]:
+        """Get every market scan saved in a time window, oldest first.
+
+        See :meth:`ScanIndex.scans_between` and :meth:`market_scans`.
+
+        Parameters
+        ----------
+            start: Optional[Union[:class:`int`, :class:`datetime`]]
+                The earliest time. ``None`` starts at the oldest scan.
+
+            end: Optional[Union[:class:`int`, :class:`datetime`]]
+                The latest time. ``None`` ends at the newest scan.
+
+            refresh: :class:`bool`
+                Whether to call :meth:`refresh_scan_index` first.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            List[Union[:class:`MarketInstance`, :class:`Exception`]]
+        """
+        if refresh:
+            self.refresh_scan_index()
+
+        ids = [id for _, id in self._scan_index.scans_between(start, end)]
+        return self.market_scans(ids, *args, concurrency=concurrency, **kwargs)
+
+    def sync(self, concurrency: int = 8) -> List[int]:
+        """Download every scan of :meth:`scan_history` missing from :attr:`archive`.
+
+        Scans that were stored are kept even if others fail, in which case the
+        first error is raised and the archive is not marked as synced.
+
+        Parameters
+        ----------
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            List[:class:`int`]
+                The ids of the scans that were missing.
+        """
+        if self._archive is None:
+            raise RuntimeError("this client has no archive to sync")
+
+        missing = [id for id in self.scan_history().values() if id not in self._archive]
+        self._store_scans(missing, concurrency)
+        return missing
+
+    def _store_scans(self, ids: List[int], concurrency: int = 8) -> None:
+        def fetch(id: int) -> Union[Exception, None]:
+            try:
+                self._fetch_scan(id)
+            except Exception as e:
+                return e
+            return None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            errors = [e for e in pool.map(fetch, ids) if e is not None]
+
+        if errors:
+            raise errors[0]
+
+        self._archive.mark_synced()
 
     def all_items(self) -> List[str]:
         """Get a list of every item.
@@ -437,32 +1034,79 @@ class Vio:
             List[:class:`str`]
         :return: A list of every item.
         """
-        res = httpx.get(
-            f"{BASE_URI}/items",
-            headers=self._headers
-            ).json()
+        res = self._request_json("GET", "/items")
 
         return res 
 
-    def item_history(self, item:str) -> List[ItemInstance]:
+    def item_history(self, item:str, refresh: bool = True) -> List[ItemInstance]:
         """Get the entire scan history of an Item
 
         :param item: The item to get the history of.
+        :param refresh: With a synced :attr:`archive`, whether to store the scans published since the last sync first. This costs a request.
         :return: The history of the item.
         """
-        res = httpx.get(
-            f"{BASE_URI}/item/{item}/all",
-            headers=self._headers
-            )
+        data = self._archived_history(item, refresh)
+        if data is None:
+            data = self._request_json("GET", f"/item/{item}/all")
 
         return [
             ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"])) 
-            for i in res.json()
+            for i in data
         ]
 
+    def iter_item_history(self, item: str, refresh: bool = True) -> Iterator[ItemInstance]:
+        """Stream the entire scan history of an Item, one scan at a time.
+
+        Unlike :meth:`item_history` the response is decoded while it is
+        received, so memory use does not grow with the length of the history.
+
+        :param item: The item to get the history of.
+        :param refresh: See :meth:`item_history`.
+        :return: An iterator over the history of the item.
+        """
+        if self._archive_current(refresh):
+            for i in self._archive.iter_item_history(item):
+                yield ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"]))
+            return
+
+        wait = self._rate_limiter.acquire(f"/item/{item}/all")
+        if wait > 0:
+            time.sleep(wait)
+
+        metrics = self._metrics
+        splitter = _JSONArraySplitter()
+        start = time.perf_counter()
+        with self._http.stream("GET", f"/item/{item}/all") as res:
+            if metrics is not None:
+                metrics.record_request("GET", f"/item/{item}/all", res.status_code, time.perf_counter() - start)
+            res.raise_for_status()
+            for chunk in res.iter_bytes():
+                if metrics is not None:
+                    metrics.inc("vio_response_bytes_total", len(chunk), endpoint="/item/{item}/all")
+                for raw in splitter.feed(chunk):
+                    i = self._decode(raw)
+                    yield ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"]))
+
+    def item_history_frame(self, item: str, refresh: bool = True) -> ItemHistory:
+        """Get the entire scan history of an Item as NumPy columns.
+
+        Requires ``numpy``.
+
+        :param item: The item to get the history of.
+        :param refresh: See :meth:`item_history`.
+        :return: The history of the item.
+        """
+        data = self._archived_history(item, refresh)
+        if data is None:
+            data = self._request_json("GET", f"/item/{item}/all")
+
+        return ItemHistory.from_payload(item, data)
+
     def get_users(self, ids: List[int]) -> List[RobloxUser]:
         """Get a list of roblox users from vendor id's.
 
+        Only the id's missing from :attr:`user_cache` are requested from the API.
+
         Parameters
         ----------
             ids: :class:`List[int]`
@@ -472,70 +1116,389 @@ class Vio:
         -------
             :class:`List[User]`
         """
-        res = httpx.post(
-            f"{BASE_URI}/roblox",
-            headers=self._headers,
-            json=ids
-            ).json()
+        with _stage(self._metrics, "users"):
+            users, missing = self._user_cache.get_many(ids)
+
+            if missing:
+                res = self._request_json("POST", "/roblox", json=missing)
+                for u in res:
+                    user = RobloxUser(u)
+                    self._user_cache.put(user)
+                    users[user.id] = user
 
-        return [RobloxUser(u) for u in res]
+            return [users[i] for i in dict.fromkeys(ids) if i in users]
 
 class AsyncVio:
     """AsyncVio Class
 
     Represents an Asynchronous instance of the vio API, with a certain key.
 
+    Every request is sent through one long-lived :class:`httpx.AsyncClient`,
+    so connections are kept alive and reused between calls. Use the client
+    with ``async with``, or await :meth:`close`, to release the connection pool.
+    The pool is opened by the first request in an event loop, and a new one is
+    opened when the client is used from another loop, e.g. a later ``asyncio.run``.
+
     Parameters
     ----------
         key: :class:`str` 
             The API key to use.
+
+        limits: Optional[:class:`httpx.Limits`]
+            The connection pool limits. Defaults to :data:`DEFAULT_LIMITS`.
+
+        timeout: Optional[:class:`httpx.Timeout`]
+            The request timeouts. Defaults to :data:`DEFAULT_TIMEOUT`.
+
+        transport: Optional[:class:`httpx.AsyncBaseTransport`]
+            A custom transport to send the requests through.
+            When given, ``limits`` is ignored.
+
+        user_cache: Optional[:class:`UserCache`]
+            The cache :meth:`get_users` serves users from. Defaults to a new :class:`UserCache`.
+
+        market_cache: Optional[:class:`MarketCache`]
+            The cache of fetched scans. Defaults to a new :class:`MarketCache`.
+
+        archive: Optional[:class:`ScanArchive`]
+            A local archive of raw scans. Once :meth:`sync` has run, scans and item
+            histories are read from it instead of the API. Scans published since
+            the last sync are stored before an item history is read from it, unless
+            the API cannot be reached.
+
+        json_loads: Optional[Callable[[Union[:class:`bytes`, :class:`str`]], Any]]
+            The function that decodes response bodies and websocket messages. It is
+            given the raw bytes of a response, and a text message as a :class:`str`.
+            Defaults to :data:`DEFAULT_JSON_LOADS`.
+
+        rate_limiter: Optional[:class:`RateLimiter`]
+            Paces the requests and retries throttled or failed ones.
+            Defaults to a new :class:`RateLimiter`.
+
+        metrics: Optional[:class:`Metrics`]
+            Records request, parse, cache, websocket and handler statistics.
+            Nothing is recorded without it.
+
+        dispatcher: Optional[:class:`Dispatcher`]
+            Queues websocket updates for the event handlers, so a slow handler
+            does not hold up the listener. Defaults to a new :class:`Dispatcher`.
+
+        backoff: Optional[:class:`Backoff`]
+            The delays between websocket reconnects. Defaults to ``Backoff(1.0, 60.0)``.
+
+        max_age: Optional[:class:`float`]
+            The default ``max_age`` of :meth:`current`, in seconds.
+
+        base_url: Optional[:class:`str`]
+            The root of the HTTP API. Defaults to :data:`BASE_URI`.
+
+        ws_url: Optional[:class:`str`]
+            The websocket feed :meth:`listen` connects to. Defaults to :data:`WS_URI`.
     """
 
     
-    def __init__(self, key: str) -> None:
+    def __init__(
+        self,
+        key: str,
+        *,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        user_cache: Optional[UserCache] = None,
+        market_cache: Optional[MarketCache] = None,
+        archive: Optional[ScanArchive] = None,
+        json_loads: Optional[Callable[[Union[bytes, str]], Any]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[Metrics] = None,
+        dispatcher: Optional[Dispatcher] = None,
+        backoff: Optional[Backoff] = None,
+        max_age: Optional[float] = None,
+        base_url: Optional[str] = None,
+        ws_url: Optional[str] = None
+    ) -> None:
         self.key = key
         self._headers = {
             "X-API-KEY": self.key,
         }
 
-        self._cached_market: Set[MarketInstance] = set()
+        self._http_options: Dict[str, Any] = {
+            "base_url": base_url or BASE_URI,
+            "headers": self._headers,
+            "limits": limits or DEFAULT_LIMITS,
+            "timeout": timeout or DEFAULT_TIMEOUT,
+            "transport": transport,
+        }
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._user_cache: UserCache = user_cache if user_cache is not None else UserCache()
+        self._market_cache: MarketCache = market_cache if market_cache is not None else MarketCache()
+        self._archive: Optional[ScanArchive] = archive
+        self._loads: Callable[[Union[bytes, str]], Any] = json_loads or DEFAULT_JSON_LOADS
+        self._rate_limiter: RateLimiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self._metrics: Optional[Metrics] = metrics
+        self._scan_index: ScanIndex = ScanIndex()
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._current_market: Optional[MarketInstance] = None
+        self._current_fingerprint: Optional[bytes] = None
+        self._max_age: Optional[float] = max_age
+        self._latest_market: Optional[MarketInstance] = None
+        self._latest_at: float = 0.0
 
         self._listening: asyncio.Lock = asyncio.Lock()
         self._coro_list: Set[Coroutine] = set()
+        self._delta_list: Set[Coroutine] = set()
+        self._item_routes: Dict[str, Set[Coroutine]] = {}
+        self._delta_routes: Dict[str, Set[Coroutine]] = {}
+        self._previous_market: Optional[MarketInstance] = None
+        self._dispatcher: Dispatcher = dispatcher if dispatcher is not None else Dispatcher()
+        self._backoff: Backoff = backoff if backoff is not None else Backoff(1.0, 60.0)
+        self._ws_url: str = ws_url or WS_URI
+
+        if metrics is not None:
+            metrics.track_cache("users", self._user_cache)
+            metrics.track_cache("markets", self._market_cache)
+            metrics.track_dispatcher(self._dispatcher)
+
+    async def __aenter__(self) -> "AsyncVio":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the connection pool of the client."""
+        client, self._http_client = self._http_client, None
+        # The pool of a loop that is gone cannot be closed from this one.
+        if client is not None and self._http_loop is asyncio.get_event_loop():
+            await client.aclose()
+        self._http_loop = None
+
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them.
+        loop = asyncio.get_event_loop()
+        if self._http_client is None or self._http_loop is not loop:
+            self._http_client = httpx.AsyncClient(**self._http_options)
+            self._http_loop = loop
+        return self._http_client
+
+    @property
+    def user_cache(self) -> UserCache:
+        """:class:`UserCache`: The cache of users fetched by :meth:`get_users`."""
+        return self._user_cache
+
+    @property
+    def market_cache(self) -> MarketCache:
+        """:class:`MarketCache`: The cache of fetched scans, keyed by scan id."""
+        return self._market_cache
+
+    @property
+    def archive(self) -> Optional[ScanArchive]:
+        """Optional[:class:`ScanArchive`]: The local archive of raw scans, if any."""
+        return self._archive
+
+    @property
+    def scan_index(self) -> ScanIndex:
+        """:class:`ScanIndex`: The scans seen by :meth:`scan_history`, sorted by time."""
+        return self._scan_index
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """:class:`RateLimiter`: Paces and retries the requests of the client."""
+        return self._rate_limiter
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """Optional[:class:`Metrics`]: The statistics of the client, if it records any."""
+        return self._metrics
+
+    @property
+    def dispatcher(self) -> Dispatcher:
+        """:class:`Dispatcher`: The queues between the listener and the event handlers."""
+        return self._dispatcher
+
+    def _cached_scan(self, id: int, query_users: bool) -> Union[MarketInstance, None]:
+        market = self._market_cache.get(id)
+        if market is not None and (market._has_users or not query_users):
+            return market
+        return None
+
+    async def _archive_current(self, refresh: bool) -> bool:
+        if self._archive is None or self._archive.synced is None:
+            return False
+
+        if refresh:
+            # Scans published since the last sync are not archived yet, store them first.
+            # Without the API the archived scans are still the best answer.
+            try:
+                await self.refresh_scan_index()
+                missing = [id for id in self._scan_index.ids if id not in self._archive]
+                if missing:
+                    await self._store_scans(missing)
+            except httpx.HTTPError:
+                pass
+        return True
+
+    async def _archived_history(self, item: str, refresh: bool) -> Union[List[dict], None]:
+        if not await self._archive_current(refresh):
+            return None
+        return self._archive.item_history(item)
+
+    def _unchanged_current(self, fingerprint: bytes, query_users: bool) -> Union[MarketInstance, None]:
+        market = self._current_market
+        if fingerprint == self._current_fingerprint and market is not None and (market._has_users or not query_users):
+            return market
+        return None
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        limiter = self._rate_limiter
+        metrics = self._metrics
+        backoff = limiter.backoff()
+        while True:
+            wait = limiter.acquire(path)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            start = time.perf_counter()
+            res = await self._http.request(method, path, **kwargs)
+            if metrics is not None:
+                metrics.record_request(
+                    method, path, res.status_code, time.perf_counter() - start,
+                    len(res.request.content), len(res.content)
+                )
+
+            delay = limiter.retry_delay(path, res, backoff)
+            if delay is None:
+                break
+            if metrics is not None:
+                metrics.inc("vio_request_retries_total", endpoint=endpoint(path))
+            await asyncio.sleep(delay)
+
+        res.raise_for_status()
+        return res
+
+    async def _request_json(self, method: str, path: str, **kwargs) -> Any:
+        # Concurrent GETs of the same path share one request and its decoded body.
+        if method == "GET" and not kwargs:
+            return await self._single_flight((method, path), lambda: self._fetch_json(method, path))
+        return await self._fetch_json(method, path, **kwargs)
+
+    async def _fetch_json(self, method: str, path: str, **kwargs) -> Any:
+        return self._decode((await self._request(method, path, **kwargs)).content)
+
+    def _decode(self, body: Union[bytes, str]) -> Any:
+        with _stage(self._metrics, "decode"):
+            return self._loads(body)
+
+    def _single_flight(self, key: Tuple, factory: Callable[[], Awaitable]) -> Awaitable:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+
+            def forget(_) -> None:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+            future.add_done_callback(forget)
+        # One caller being cancelled must not cancel the request for the others.
+        return asyncio.shield(future)
+
+    def _remember_latest(self, market: MarketInstance) -> None:
+        latest = self._latest_market
+        if latest is not None and (
+            market.scan_info.unix < latest.scan_info.unix
+            or (market.scan_info.unix == latest.scan_info.unix and not market._has_users)
+        ):
+            return
+        self._latest_market = market
+        self._latest_at = time.monotonic()
+
+    async def _fetch_scan(self, id: int) -> dict:
+        if self._archive is not None:
+            data = self._archive.get(id)
+            if data is not None:
+                return data
+
+        data = await self._request_json("GET", f"/market/{id}")
+        if self._archive is not None:
+            self._archive.put(data)
+        return data
 
     ## MARKET
 
     async def current(self, *args, **kwargs) -> MarketInstance:
         """Get the current market
 
+        Concurrent calls with the same options share one request. When the
+        response is byte for byte the one of the previous call, the market built
+        then is returned without decoding anything.
+
         Parameters
         ----------
             query_users: :class:`bool`
                 Whether or not to query the users of the listings.
 
+            lazy: :class:`bool`
+                Whether to only build the items of the market when they are accessed.
+
+            max_age: Optional[:class:`float`]
+                Return the latest known market instead of requesting one, if it was
+                received at most this many seconds ago. Markets from :meth:`listen`
+                count, but carry no users, so they are only used with ``query_users=False``.
+                Defaults to the client's ``max_age``.
+
         Returns
         -------
             :class:`MarketInstance`
         """
-        async with httpx.AsyncClient() as client:
-            res = await client.get(
-                f"{BASE_URI}/market",
-                headers=self._headers
-                )
+        max_age = kwargs.pop("max_age", self._max_age)
+        query_users = kwargs.get("query_users", True)
+
+        latest = self._latest_market
+        if (
+            max_age is not None
+            and latest is not None
+            and (latest._has_users or not query_users)
+            and time.monotonic() - self._latest_at <= max_age
+        ):
+            return latest
+
+        key = ("current", args, query_users, kwargs.get("lazy", False))
+        return await self._single_flight(key, lambda: self._current(*args, **kwargs))
+
+    async def _current(self, *args, **kwargs) -> MarketInstance:
+        # Most polls return the scan we already built, so skip decoding it again.
+        body = (await self._request("GET", "/market")).content
+        fingerprint = _fingerprint(body)
+        market = self._unchanged_current(fingerprint, kwargs.get("query_users", True))
+        if market is not None:
+            self._remember_latest(market)
+            return market
+
+        res = self._decode(body)
+        if self._archive is not None:
+            self._archive.put(res)
 
         if kwargs.get("query_users", True):
             ids = _get_ids_from_market(res)
             all_users = await self.get_users(ids)
             kwargs["users"] = all_users
 
-        self._latest_market = MarketInstance(res.json(), *args, **kwargs)
-        if self._latest_market not in self._cached_market:
-            self._cached_market.add(self._latest_market)
-        return self._latest_market
+        with _stage(self._metrics, "build"):
+            market = MarketInstance(res, *args, **kwargs)
+        self._market_cache.put(market)
+        self._remember_latest(market)
+        self._current_market = market
+        self._current_fingerprint = fingerprint
+        return market
 
     async def market_scan(self, id: int, *args, **kwargs) -> MarketInstance:
         """Get a market scan from a previous date.
 
+        Scans already in :attr:`market_cache` or :attr:`archive` are returned without a request.
+
         Parameters
         ----------
             id: :class:`int`
@@ -544,29 +1507,112 @@ class AsyncVio:
             query_users: :class:`bool`
                 Whether or not to query the users of the listings.
 
+            lazy: :class:`bool`
+                Whether to only build the items of the market when they are accessed.
+
         Returns
         -------
             :class:`MarketInstance`
         """
 
-        async with httpx.AsyncClient() as client:
-            res = await client.get(
-                f"{BASE_URI}/market/{id}",
-                headers=self._headers
-                )
+        market = self._cached_scan(id, kwargs.get("query_users", True))
+        if market is not None:
+            return market
+
+        res = await self._fetch_scan(id)
 
         if kwargs.get("query_users", True):
             ids = _get_ids_from_market(res)
             all_users = await self.get_users(ids)
             kwargs["users"] = all_users
 
-        market = MarketInstance(res.json(), *args, **kwargs)
-
-        if market not in self._cached_market:
-            self._cached_market.add(market)
+        with _stage(self._metrics, "build"):
+            market = MarketInstance(res, *args, **kwargs)
+        self._market_cache.put(market)
 
         return market
 
+    async def market_scans(self, ids: Iterable[int], *args, concurrency: int = 8, **kwargs) -> List[Union[MarketInstance, Exception]]:
+        """Get many market scans concurrently, in the order of ``ids``.
+
+        At most ``concurrency`` scans are fetched at once, then the users of
+        the whole batch are looked up in one :meth:`get_users` call.
+        A scan that failed is returned as the exception it raised.
+
+        Parameters
+        ----------
+            ids: Iterable[:class:`int`]
+                The ids of the market scans to get.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+            query_users: :class:`bool`
+                Whether or not to query the users of the listings.
+
+        Returns
+        -------
+            List[Union[:class:`MarketInstance`, :class:`Exception`]]
+        """
+        ids = list(ids)
+        query_users = kwargs.get("query_users", True)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(id: int) -> Union[dict, MarketInstance, Exception]:
+            market = self._cached_scan(id, query_users)
+            if market is not None:
+                return market
+            try:
+                async with semaphore:
+                    return await self._fetch_scan(id)
+            except Exception as e:
+                return e
+
+        unique = list(dict.fromkeys(ids))
+        payloads = dict(zip(unique, await asyncio.gather(*[fetch(id) for id in unique])))
+
+        if query_users:
+            kwargs["users"] = await self.get_users(_get_ids_from_markets(p for p in payloads.values() if isinstance(p, dict)))
+
+        markets = _build_markets(payloads, self._market_cache, args, kwargs, self._metrics)
+        return [markets[id] for id in ids]
+
+    async def iter_market_scans(self, ids: Iterable[int], *args, concurrency: int = 8, **kwargs) -> AsyncIterator[Tuple[int, Union[MarketInstance, Exception]]]:
+        """Get many market scans concurrently, as they complete.
+
+        Each scan is fetched with :meth:`market_scan`, so its users are
+        resolved through :attr:`user_cache` rather than in a single batch.
+
+        Parameters
+        ----------
+            ids: Iterable[:class:`int`]
+                The ids of the market scans to get.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            AsyncIterator[Tuple[:class:`int`, Union[:class:`MarketInstance`, :class:`Exception`]]]
+                The id of each scan with the scan, or the exception it raised.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(id: int) -> Tuple[int, Union[MarketInstance, Exception]]:
+            try:
+                async with semaphore:
+                    return id, await self.market_scan(id, *args, **kwargs)
+            except Exception as e:
+                return id, e
+
+        tasks = [asyncio.ensure_future(fetch(id)) for id in dict.fromkeys(ids)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def scan_history(self) -> Dict[datetime, int]:
         """Get a dictionary of Datetimes to ints of the scan history.
 
@@ -575,13 +1621,100 @@ class AsyncVio:
             Dict[:class:`datetime`, :class:`int`]
         :return: A dictionary of Datetimes to ints of the scan history.
         """
-        async with httpx.AsyncClient() as client:
-            res = await client.get(
-                f"{BASE_URI}/market/history",
-                headers=self._headers
-                )
+        res = await self._request_json("GET", "/market/history")
+
+        history = {datetime.fromisoformat(k): v for k, v in res.items()}
+        self._scan_index.update(history)
+        return history
+
+    async def refresh_scan_index(self) -> List[int]:
+        """Add the scans published since the last refresh to :attr:`scan_index`.
+
+        Returns
+        -------
+            List[:class:`int`]
+                The ids of the new scans, oldest first.
+        """
+        res = await self._request_json("GET", "/market/history")
+
+        return self._scan_index.update({datetime.fromisoformat(k): v for k, v in res.items()})
+
+    async def market_scans_between(
+        self,
+        start: Optional[Union[int, datetime]],
+        end: Optional[Union[int, datetime]],
+        *args,
+        refresh: bool = True,
+        concurrency: int = 8,
+        **kwargs
+    ) -> List[Union[MarketInstance, Exception]]:
+        """Get every market scan saved in a time window, oldest first.
+
+        See :meth:`ScanIndex.scans_between` and :meth:`market_scans`.
+
+        Parameters
+        ----------
+            start: Optional[Union[:class:`int`, :class:`datetime`]]
+                The earliest time. ``None`` starts at the oldest scan.
+
+            end: Optional[Union[:class:`int`, :class:`datetime`]]
+                The latest time. ``None`` ends at the newest scan.
+
+            refresh: :class:`bool`
+                Whether to call :meth:`refresh_scan_index` first.
+
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            List[Union[:class:`MarketInstance`, :class:`Exception`]]
+        """
+        if refresh:
+            await self.refresh_scan_index()
+
+        ids = [id for _, id in self._scan_index.scans_between(start, end)]
+        return await self.market_scans(ids, *args, concurrency=concurrency, **kwargs)
+
+    async def sync(self, concurrency: int = 8) -> List[int]:
+        """Download every scan of :meth:`scan_history` missing from :attr:`archive`.
+
+        Scans that were stored are kept even if others fail, in which case the
+        first error is raised and the archive is not marked as synced.
+
+        Parameters
+        ----------
+            concurrency: :class:`int`
+                The maximum amount of scans fetched at once.
+
+        Returns
+        -------
+            List[:class:`int`]
+                The ids of the scans that were missing.
+        """
+        if self._archive is None:
+            raise RuntimeError("this client has no archive to sync")
+
+        missing = [id for id in (await self.scan_history()).values() if id not in self._archive]
+        await self._store_scans(missing, concurrency)
+        return missing
+
+    async def _store_scans(self, ids: List[int], concurrency: int = 8) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(id: int) -> None:
+            async with semaphore:
+                await self._fetch_scan(id)
+
+        errors = [
+            e for e in await asyncio.gather(*[fetch(id) for id in ids], return_exceptions=True)
+            if isinstance(e, Exception)
+        ]
 
-        return {datetime.fromisoformat(k): v for k, v in res.items()}
+        if errors:
+            raise errors[0]
+
+        self._archive.mark_synced()
 
     ## ITEMS
 
@@ -593,40 +1726,110 @@ class AsyncVio:
             List[:class:`str`]
         :return: A list of every item.
         """
-        async with httpx.AsyncClient() as client:
-            res = await client.get(
-                f"{BASE_URI}/items",
-                headers=self._headers
-                ).json()
+        res = await self._request_json("GET", "/items")
 
         return res
 
-    async def item_history(self, item: str) -> List[ItemInstance]:
+    async def item_history(self, item: str, refresh: bool = True) -> List[ItemInstance]:
         """Get the entire scan history of an Item
 
         Parameters
         ----------
             item: :class:`str`
                 The item to get the history of.
+
+            refresh: :class:`bool`
+                With a synced :attr:`archive`, whether to store the scans published
+                since the last sync first. This costs a request.
         Returns
         -------
             :class:`List[ItemInstance]`
         """
-        async with httpx.AsyncClient() as client:
-            res = await client.get(
-                f"{BASE_URI}/item/{item}/all",
-                headers=self._headers
-                )
+        data = await self._archived_history(item, refresh)
+        if data is None:
+            data = await self._request_json("GET", f"/item/{item}/all")
 
         return [
             ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"])) 
-            for i in res.json()
+            for i in data
         ]
 
+    async def iter_item_history(self, item: str, refresh: bool = True) -> AsyncIterator[ItemInstance]:
+        """Stream the entire scan history of an Item, one scan at a time.
+
+        Unlike :meth:`item_history` the response is decoded while it is
+        received, so memory use does not grow with the length of the history.
+
+        Example
+        -------
+
+        .. code-block:: python3
+
+            async for instance in vio.iter_item_history("Korrelite"):
+                print(instance.summary.buy_price)
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The item to get the history of.
+
+            refresh: :class:`bool`
+                See :meth:`item_history`.
+        Returns
+        -------
+            AsyncIterator[:class:`ItemInstance`]
+        """
+        if await self._archive_current(refresh):
+            for i in self._archive.iter_item_history(item):
+                yield ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"]))
+            return
+
+        wait = self._rate_limiter.acquire(f"/item/{item}/all")
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        metrics = self._metrics
+        splitter = _JSONArraySplitter()
+        start = time.perf_counter()
+        async with self._http.stream("GET", f"/item/{item}/all") as res:
+            if metrics is not None:
+                metrics.record_request("GET", f"/item/{item}/all", res.status_code, time.perf_counter() - start)
+            res.raise_for_status()
+            async for chunk in res.aiter_bytes():
+                if metrics is not None:
+                    metrics.inc("vio_response_bytes_total", len(chunk), endpoint="/item/{item}/all")
+                for raw in splitter.feed(chunk):
+                    i = self._decode(raw)
+                    yield ItemInstance(i["data"]["marketInfo"][item], item, ScanInfo(i["data"]["scInfo"]))
+
+    async def item_history_frame(self, item: str, refresh: bool = True) -> ItemHistory:
+        """Get the entire scan history of an Item as NumPy columns.
+
+        Requires ``numpy``.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The item to get the history of.
+
+            refresh: :class:`bool`
+                See :meth:`item_history`.
+        Returns
+        -------
+            :class:`ItemHistory`
+        """
+        data = await self._archived_history(item, refresh)
+        if data is None:
+            data = await self._request_json("GET", f"/item/{item}/all")
+
+        return ItemHistory.from_payload(item, data)
+
     # Roblox
     async def get_users(self, ids: List[int]) -> List[RobloxUser]:
         """Get a list of roblox users from vendor id's.
 
+        Only the id's missing from :attr:`user_cache` are requested from the API.
+
         Parameters
         ----------
             ids: :class:`List[int]`
@@ -636,52 +1839,175 @@ class AsyncVio:
         -------
             :class:`List[User]`
         """
-        async with httpx.AsyncClient() as client:
-            res = await client.post(
-                f"{BASE_URI}/roblox",
-                headers=self._headers,
-                json=ids
+        with _stage(self._metrics, "users"):
+            users, missing = self._user_cache.get_many(ids)
+
+            if missing:
+                res = await self._single_flight(
+                    ("POST", "/roblox", tuple(missing)),
+                    lambda: self._request_json("POST", "/roblox", json=missing)
                 )
+                for u in res:
+                    user = RobloxUser(u)
+                    self._user_cache.put(user)
+                    users[user.id] = user
 
-        return [RobloxUser(u) for u in res.json()]
+            return [users[i] for i in dict.fromkeys(ids) if i in users]
         
 
     ## WS
 
-    async def listen(self) -> None:
+    async def listen(self, backfill: bool = True) -> None:
         """
         Creates a websocket connection and lets the websocket listen to 
         messages from VIO. This will run forever.
 
+        When the connection drops it is reopened after a delay from the client's
+        :class:`Backoff`. With ``backfill`` the scans published while disconnected
+        are then fetched and handed to the handlers, oldest first, before any
+        new message. If a missed scan cannot be fetched, the error is passed to
+        the loop's exception handler and the connection is reopened after a
+        delay, so new messages are only handled once nothing before them is missing.
+
+        Parameters
+        ----------
+            backfill: :class:`bool`
+                Whether to fetch the scans missed while disconnected.
         """
         if self._listening.locked():
             return
 
+        metrics = self._metrics
+        loop = asyncio.get_event_loop()
         async with self._listening:
-            async for socket in websockets.connect(WS_URI, extra_headers=self._headers):
-                try:
-                    while True:
-                        res = await socket.recv()
-                        res = json.loads(res)
-                        if res["Rtype"] == "Update":
-                            instance = MarketInstance(res["DataType"])
-                            self._cached_market.add(instance)
-                            await asyncio.gather(*[coro(instance) for coro in self._coro_list])
-                except websockets.ConnectionClosed:
-                    pass
+            try:
+                while True:
+                    try:
+                        async with websockets.connect(self._ws_url, extra_headers=self._headers) as socket:
+                            if backfill and self._previous_market is not None:
+                                await self._backfill()
+                            self._backoff.reset()
+
+                            while True:
+                                res = await socket.recv()
+                                if metrics is not None:
+                                    # Text frames arrive as str, count their encoded size.
+                                    metrics.record_message(len(res.encode()) if isinstance(res, str) else len(res))
+                                res = self._decode(res)
+                                if res["Rtype"] == "Update":
+                                    with _stage(metrics, "build"):
+                                        instance = MarketInstance(res["DataType"], lazy=True)
+                                    if metrics is not None:
+                                        metrics.observe("vio_ws_lag_seconds", time.time() - instance.scan_info.unix)
+                                    self._market_cache.put(instance)
+                                    with _stage(metrics, "dispatch"):
+                                        await self._deliver(instance)
+                    except (websockets.ConnectionClosed, websockets.InvalidHandshake, OSError, asyncio.TimeoutError, httpx.HTTPError) as e:
+                        if isinstance(e, httpx.HTTPError):
+                            # Handling live messages now would leave a hole, reconnect and backfill again.
+                            loop.call_exception_handler({
+                                "message": "Could not backfill the missed market scans",
+                                "exception": e,
+                            })
+                        if metrics is not None:
+                            metrics.inc("vio_ws_reconnects_total")
+                        await asyncio.sleep(self._backoff.next())
+            finally:
+                await self._dispatcher.close()
+
+    async def _backfill(self) -> None:
+        last = self._previous_market
+        await self.refresh_scan_index()
+
+        ids = [id for when, id in self._scan_index.scans_between(last.scan_info.datetime) if id != last.id]
+        for id, market in zip(ids, await self.market_scans(ids, query_users=False, lazy=True)):
+            if isinstance(market, Exception):
+                # The scans before it were handed out, so the next backfill starts here.
+                if _retryable(market):
+                    raise market
+                asyncio.get_event_loop().call_exception_handler({
+                    "message": f"Could not backfill market scan {id}",
+                    "exception": market,
+                })
+                continue
+            await self._deliver(market)
+
+    async def _deliver(self, instance: MarketInstance) -> None:
+        # Backfilled and live scans can overlap right after a reconnect.
+        last = self._previous_market
+        if last is not None and instance.scan_info.unix <= last.scan_info.unix:
+            return
+
+        self._remember_latest(instance)
+        await self._dispatch(instance, last)
+        self._previous_market = instance
+
+    async def _dispatch(self, instance: MarketInstance, previous: Optional[MarketInstance]) -> None:
+        submit = self._dispatcher.submit
+
+        # submit can wait on a full queue, in which time a handler may register.
+        for coro in tuple(self._coro_list):
+            await submit(coro, instance)
+
+        # Only the items someone subscribed to are built from a lazy market.
+        for item, handlers in tuple(self._item_routes.items()):
+            item_instance = instance[item]
+            if item_instance is not None:
+                for coro in tuple(handlers):
+                    await submit(coro, item_instance, item)
+
+        deltas = None
+        delta_list = tuple(self._delta_list)
+        if delta_list:
+            deltas = diff_markets(previous, instance)
+            for delta in deltas.values():
+                for coro in delta_list:
+                    await submit(coro, delta, delta.item)
+
+        for item, handlers in tuple(self._delta_routes.items()):
+            delta = deltas.get(item) if deltas is not None else diff_items(item, previous, instance)
+            if delta is not None:
+                for coro in tuple(handlers):
+                    await submit(coro, delta, item)
 
     def run(self) -> None:
         """A blocking call that runs the listen coroutine.
         
         If you want more control then use :meth:`listen` instead.
+        The connection pool is closed when it returns.
         """
+        async def runner() -> None:
+            try:
+                await self.listen()
+            finally:
+                await self.close()
+
         try:
-            asyncio.run(self.listen())
+            asyncio.run(runner())
         except KeyboardInterrupt:
             pass
         
-    def event(self, coro: Coroutine) -> Coroutine:
+    def event(
+        self,
+        coro: Optional[Coroutine] = None,
+        *,
+        delta: bool = False,
+        items: Optional[Iterable[str]] = None,
+        queue_size: Optional[int] = None,
+        overflow: Optional[Overflow] = None
+    ) -> Coroutine:
         """A decorator that registers a coroutine to be called when new market data is received.
+
+        With ``delta=True`` the coroutine is instead called with an :class:`ItemDelta`
+        for every item that changed since the previous update. On the first update
+        every item counts as new.
+
+        With ``items`` the coroutine is only called for those items, with their
+        :class:`ItemInstance` (or :class:`ItemDelta` when ``delta=True``). Items
+        nobody subscribed to are not parsed.
+
+        Every coroutine is fed from its own bounded queue by :attr:`dispatcher`.
+        ``queue_size`` and ``overflow`` override the dispatcher's defaults for it.
         
         Example
         -------
@@ -691,12 +2017,28 @@ class AsyncVio:
             @vio.event
             async def print_market(market: MarketInstance):
                 print(market["Korrelite"])
-        """
-        if not asyncio.iscoroutinefunction(coro):
-            raise TypeError("event must be a coroutine function")
 
-        self._coro_list.add(coro)
-        return coro
-        
-        
-        
+            @vio.event(delta=True)
+            async def print_moves(delta: ItemDelta):
+                print(delta.item, delta.buy_price_change, delta.sell_price_change)
+
+            @vio.event(items=["Korrelite", "Axnit"], overflow=Overflow.latest)
+            async def print_item(item: ItemInstance):
+                print(item)
+        """
+        def decorator(coro: Coroutine) -> Coroutine:
+            if not asyncio.iscoroutinefunction(coro):
+                raise TypeError("event must be a coroutine function")
+
+            if items is None:
+                (self._delta_list if delta else self._coro_list).add(coro)
+            else:
+                routes = self._delta_routes if delta else self._item_routes
+                for item in items:
+                    routes.setdefault(item, set()).add(coro)
+
+            if queue_size is not None or overflow is not None:
+                self._dispatcher.configure(coro, queue_size, overflow)
+            return coro
+
+        return decorator(coro) if coro is not None else decorator
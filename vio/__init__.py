@@ -1 +1,13 @@
-from .Vio import *
\ No newline at end of file
+from .Vio import *
+from .cache import *
+from .history import *
+from .archive import *
+from .snapshot import *
+from .diff import *
+from .dispatch import *
+from .backoff import *
+from .index import *
+from .analytics import *
+from .ratelimit import *
+from .metrics import *
+from .synthetic import *
@@ -0,0 +1,513 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Union,
+    List,
+    Dict
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from .Vio import Listing, MarketInstance
+
+__all__ = (
+    "Fill",
+    "OrderBook",
+    "MarketScreen",
+)
+
+_SCREEN_COLUMNS = (
+    "buy_price",
+    "sell_price",
+    "buy_volume",
+    "sell_volume",
+    "buy_depth",
+    "sell_depth",
+    "spread",
+    "spread_pct",
+    "mid_price",
+)
+
+
+def _check_side(side: str) -> None:
+    if side not in ("buy", "sell"):
+        raise ValueError("side must be 'buy' or 'sell'")
+
+
+class Fill:
+    """Represents the result of filling an order against an :class:`OrderBook`.
+
+    Parameters
+    ----------
+        units: :class:`int`
+            The amount of units asked for.
+
+        filled: :class:`int`
+            The amount of units the listings could fill.
+
+        cost: :class:`float`
+            The total price of the filled units.
+
+        best: :class:`float`
+            The best price on the side that was filled against.
+    """
+
+    __slots__ = ("_units", "_filled", "_cost", "_best")
+
+    def __init__(self, units: int, filled: int, cost: float, best: float) -> None:
+        self._units: int = units
+        self._filled: int = filled
+        self._cost: float = cost
+        self._best: float = best
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.units=},{self.filled=},{self.cost=},{self.average_price=})>"
+
+    @property
+    def units(self) -> int:
+        """:class:`int`: The amount of units asked for"""
+        return self._units
+
+    @property
+    def filled(self) -> int:
+        """:class:`int`: The amount of units the listings could fill"""
+        return self._filled
+
+    @property
+    def complete(self) -> bool:
+        """:class:`bool`: Whether every unit could be filled"""
+        return self._filled >= self._units
+
+    @property
+    def cost(self) -> float:
+        """:class:`float`: The total price of the filled units"""
+        return self._cost
+
+    @property
+    def average_price(self) -> float:
+        """:class:`float`: The average price per filled unit, ``nan`` if nothing was filled"""
+        return self._cost / self._filled if self._filled else float("nan")
+
+    @property
+    def slippage(self) -> float:
+        """:class:`float`: How much worse the average price is than the best price"""
+        return abs(self.average_price - self._best)
+
+
+class _Side:
+    # Listings of one side sorted from the best price to the worst, with the
+    # running volume and notional so every query is a single bisect.
+    __slots__ = ("keys", "prices", "volumes", "notionals")
+
+    def __init__(self, listings: List["Listing"], descending: bool) -> None:
+        ordered = sorted(listings, key=lambda l: -l.price if descending else l.price)
+        self.prices: List[float] = [l.price for l in ordered]
+        self.keys: List[float] = [-p for p in self.prices] if descending else self.prices
+        self.volumes: List[int] = list(accumulate(l.volume for l in ordered))
+        self.notionals: List[float] = list(accumulate(l.price * l.volume for l in ordered))
+
+    @property
+    def total(self) -> int:
+        return self.volumes[-1] if self.volumes else 0
+
+    def volume_of(self, levels: Optional[int]) -> int:
+        if levels is None or levels >= len(self.volumes):
+            return self.total
+        return self.volumes[levels - 1] if levels > 0 else 0
+
+    def fill(self, units: int) -> Fill:
+        best = self.prices[0] if self.prices else float("nan")
+        if units <= 0 or not self.prices:
+            return Fill(units, 0, 0.0, best)
+
+        i = bisect_left(self.volumes, units)
+        if i == len(self.volumes):
+            return Fill(units, self.total, self.notionals[-1], best)
+
+        before, cost = (self.volumes[i - 1], self.notionals[i - 1]) if i else (0, 0.0)
+        return Fill(units, units, cost + (units - before) * self.prices[i], best)
+
+
+class OrderBook:
+    """Sorted, cumulative views of an item's listings for fast depth and fill queries.
+
+    Built once per :class:`ItemListings` (see :attr:`ItemListings.book`); every
+    query afterwards is a binary search.
+
+    Parameters
+    ----------
+        buy: List[:class:`Listing`]
+            The buy listings.
+
+        sell: List[:class:`Listing`]
+            The sell listings.
+    """
+
+    __slots__ = ("_bids", "_asks")
+
+    def __init__(self, buy: List["Listing"], sell: List["Listing"]) -> None:
+        self._bids: _Side = _Side(buy, descending=True)
+        self._asks: _Side = _Side(sell, descending=False)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.best_bid=},{self.best_ask=},{self.bid_volume=},{self.ask_volume=})>"
+
+    def depth_at(self, price: float, side: str) -> int:
+        """Get the volume listed at a price or better.
+
+        Parameters
+        ----------
+            price: :class:`float`
+                The price.
+
+            side: :class:`str`
+                ``"buy"`` counts buy listings at or above ``price``,
+                ``"sell"`` counts sell listings at or below ``price``.
+
+        Returns
+        -------
+            :class:`int`
+        """
+        _check_side(side)
+        book = self._bids if side == "buy" else self._asks
+        i = bisect_right(book.keys, -price if side == "buy" else price)
+        return book.volumes[i - 1] if i else 0
+
+    def fill(self, units: int, side: str) -> Fill:
+        """Get the cost of trading units against the listings.
+
+        Parameters
+        ----------
+            units: :class:`int`
+                The amount of units to trade.
+
+            side: :class:`str`
+                ``"buy"`` buys from the sell listings, ``"sell"`` sells to the buy listings.
+
+        Returns
+        -------
+            :class:`Fill`
+        """
+        _check_side(side)
+        return (self._asks if side == "buy" else self._bids).fill(units)
+
+    def average_fill_price(self, units: int, side: str) -> float:
+        """Get the average price of trading units. See :meth:`fill`."""
+        return self.fill(units, side).average_price
+
+    def slippage(self, units: int, side: str) -> float:
+        """Get how much worse than the best price trading units is on average. See :meth:`fill`."""
+        return self.fill(units, side).slippage
+
+    def imbalance(self, levels: Optional[int] = None) -> float:
+        """Get the imbalance between buy and sell volume.
+
+        Parameters
+        ----------
+            levels: Optional[:class:`int`]
+                Only count the best ``levels`` listings of each side. ``None`` counts every listing.
+
+        Returns
+        -------
+            :class:`float`
+                From ``-1`` (only sell volume) to ``1`` (only buy volume).
+        """
+        bid, ask = self._bids.volume_of(levels), self._asks.volume_of(levels)
+        return (bid - ask) / (bid + ask) if bid + ask else 0.0
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        """Optional[:class:`float`]: The highest buy price"""
+        return self._bids.prices[0] if self._bids.prices else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        """Optional[:class:`float`]: The lowest sell price"""
+        return self._asks.prices[0] if self._asks.prices else None
+
+    @property
+    def spread(self) -> Optional[float]:
+        """Optional[:class:`float`]: The lowest sell price minus the highest buy price"""
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid_price(self) -> Optional[float]:
+        """Optional[:class:`float`]: The average of the highest buy and lowest sell price"""
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    @property
+    def bid_volume(self) -> int:
+        """:class:`int`: The total volume of the buy listings"""
+        return self._bids.total
+
+    @property
+    def ask_volume(self) -> int:
+        """:class:`int`: The total volume of the sell listings"""
+        return self._asks.total
+
+
+class MarketScreen:
+    """A table of the summaries of every item in a market, as NumPy columns.
+
+    It is computed in one pass over the market (see :attr:`MarketInstance.screen`),
+    after which sorting, filtering and top-k selection are array operations.
+    Lazy markets are read from their decoded data without building any item.
+
+    Every method taking a ``key`` accepts a column name or an array with one
+    value per row, such as the result of :meth:`changes`.
+
+    Parameters
+    ----------
+        market: :class:`MarketInstance`
+            The market to screen.
+    """
+
+    __slots__ = ("_items", "_columns")
+
+    def __init__(self, market: "MarketInstance") -> None:
+        if np is None:
+            raise ImportError("MarketScreen requires numpy, install it with `pip install vio[numpy]`")
+
+        if market._raw is not None:
+            rows = [
+                (
+                    name,
+                    data["summary"]["buy"].get("Best", 0),
+                    data["summary"]["sell"].get("Best", 0),
+                    data["summary"]["buy"].get("Volume", 0),
+                    data["summary"]["sell"].get("Volume", 0),
+                    len(data["listings"]["buy"]),
+                    len(data["listings"]["sell"]),
+                )
+                for name, data in market._raw.items()
+            ]
+        else:
+            rows = [
+                (
+                    name,
+                    item.summary.buy_price,
+                    item.summary.sell_price,
+                    item.summary.buy_volume,
+                    item.summary.sell_volume,
+                    len(item.listings.buy),
+                    len(item.listings.sell),
+                )
+                for name, item in market.items.items()
+            ]
+
+        self._items: List[str] = [row[0] for row in rows]
+        table = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), 6)
+        buy, sell = table[:, 0], table[:, 1]
+        mid = (buy + sell) / 2
+        spread = sell - buy
+        self._columns: Dict[str, "np.ndarray"] = {
+            "buy_price": buy,
+            "sell_price": sell,
+            "buy_volume": table[:, 2],
+            "sell_volume": table[:, 3],
+            "buy_depth": table[:, 4],
+            "sell_depth": table[:, 5],
+            "spread": spread,
+            "spread_pct": np.divide(spread, mid, out=np.full(len(rows), np.nan), where=mid != 0),
+            "mid_price": mid,
+        }
+
+    @classmethod
+    def _from_columns(cls, items: List[str], columns: Dict[str, "np.ndarray"]) -> "MarketScreen":
+        screen = cls.__new__(cls)
+        screen._items = items
+        screen._columns = columns
+        return screen
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({len(self)=})>"
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _key(self, key: Union[str, "np.ndarray"]) -> "np.ndarray":
+        if isinstance(key, str):
+            return self.column(key)
+        key = np.asarray(key)
+        if key.shape != (len(self),):
+            raise ValueError("key must have one value per row")
+        return key
+
+    def _take(self, index) -> "MarketScreen":
+        items = [self._items[i] for i in np.arange(len(self))[index]]
+        return self._from_columns(items, {k: v[index] for k, v in self._columns.items()})
+
+    def column(self, name: str) -> "np.ndarray":
+        """Get a column.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                One of ``buy_price``, ``sell_price``, ``buy_volume``, ``sell_volume``,
+                ``buy_depth``, ``sell_depth``, ``spread``, ``spread_pct`` or ``mid_price``.
+
+        Returns
+        -------
+            :class:`numpy.ndarray`
+        """
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise ValueError(f"unknown column {name!r}, expected one of {_SCREEN_COLUMNS}") from None
+
+    def changes(self, previous: "MarketScreen", column: str) -> "np.ndarray":
+        """Get how a column changed since an earlier screen, aligned with this screen's rows.
+
+        Parameters
+        ----------
+            previous: :class:`MarketScreen`
+                The screen of an earlier market.
+
+            column: :class:`str`
+                The column to compare.
+
+        Returns
+        -------
+            :class:`numpy.ndarray`
+                ``nan`` for items missing from ``previous``.
+        """
+        position = {name: i for i, name in enumerate(previous._items)}
+        index = np.array([position.get(name, -1) for name in self._items], dtype=np.int64)
+        before = previous.column(column)
+        result = np.full(len(self), np.nan)
+        found = index >= 0
+        result[found] = self.column(column)[found] - before[index[found]]
+        return result
+
+    def filter(self, key: Union[str, "np.ndarray"], min: Optional[float] = None, max: Optional[float] = None) -> "MarketScreen":
+        """Keep the rows whose key is between two bounds, inclusive.
+
+        Parameters
+        ----------
+            key: Union[:class:`str`, :class:`numpy.ndarray`]
+                The column or values to compare.
+
+            min: Optional[:class:`float`]
+                The lower bound. ``None`` means no bound.
+
+            max: Optional[:class:`float`]
+                The upper bound. ``None`` means no bound.
+
+        Returns
+        -------
+            :class:`MarketScreen`
+        """
+        values = self._key(key)
+        mask = np.ones(len(self), dtype=bool)
+        if min is not None:
+            mask &= values >= min
+        if max is not None:
+            mask &= values <= max
+        return self._take(mask)
+
+    def where(self, mask: "np.ndarray") -> "MarketScreen":
+        """Keep the rows where a boolean mask is true.
+
+        Parameters
+        ----------
+            mask: :class:`numpy.ndarray`
+                One boolean per row, e.g. ``screen.column("spread") > 1``.
+
+        Returns
+        -------
+            :class:`MarketScreen`
+        """
+        return self._take(self._key(mask).astype(bool))
+
+    def sort(self, key: Union[str, "np.ndarray"], descending: bool = False) -> "MarketScreen":
+        """Sort the rows. ``nan`` values always come last.
+
+        Parameters
+        ----------
+            key: Union[:class:`str`, :class:`numpy.ndarray`]
+                The column or values to sort by.
+
+            descending: :class:`bool`
+                Whether to put the largest values first.
+
+        Returns
+        -------
+            :class:`MarketScreen`
+        """
+        values = self._key(key)
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self._take(order)
+
+    def top(self, k: int, key: Union[str, "np.ndarray"], largest: bool = True) -> "MarketScreen":
+        """Get the ``k`` rows with the largest (or smallest) key, best first.
+
+        Parameters
+        ----------
+            k: :class:`int`
+                The amount of rows.
+
+            key: Union[:class:`str`, :class:`numpy.ndarray`]
+                The column or values to rank by.
+
+            largest: :class:`bool`
+                Whether to pick the largest values.
+
+        Returns
+        -------
+            :class:`MarketScreen`
+        """
+        values = self._key(key).astype(np.float64)
+        values = np.where(np.isnan(values), np.inf, -values if largest else values)
+        k = min(max(k, 0), len(self))
+        if k == 0:
+            return self._take(np.arange(0))
+        index = np.argpartition(values, k - 1)[:k] if k < len(self) else np.arange(len(self))
+        return self._take(index[np.argsort(values[index], kind="stable")])
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Get the table as ``{item: {column: value}}``."""
+        return {
+            name: {column: float(values[i]) for column, values in self._columns.items()}
+            for i, name in enumerate(self._items)
+        }
+
+    @property
+    def items(self) -> List[str]:
+        """List[:class:`str`]: The item of every row"""
+        return list(self._items)
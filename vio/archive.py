@@ -0,0 +1,240 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+import sqlite3
+import threading
+import time
+
+from typing import (
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+    List,
+    Set
+)
+
+__all__ = (
+    "ScanArchive",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    captured INTEGER NOT NULL,
+    scan_info TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_captured ON scans (captured);
+CREATE TABLE IF NOT EXISTS items (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    item TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (item, scan_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class ScanArchive:
+    """A local SQLite archive of raw market scans keyed by scan id.
+
+    Every item of a scan is stored in its own row, so the history of one item
+    can be read back without decoding the other items.
+
+    The archive can be shared between the threads of one process.
+
+    Parameters
+    ----------
+        path: :class:`str`
+            The path of the database file. ``":memory:"`` keeps it in memory.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path: str = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._ids: Set[int] = {row[0] for row in self._db.execute("SELECT id FROM scans")}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.path=},{len(self)=})>"
+
+    def __enter__(self) -> "ScanArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._ids
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def put(self, data: dict) -> None:
+        """Store a raw market scan, replacing any scan with the same id.
+
+        Parameters
+        ----------
+            data: :class:`dict`
+                The decoded ``/market/{id}`` response.
+        """
+        self.put_many([data])
+
+    def put_many(self, scans: Iterable[dict]) -> None:
+        """Store many raw market scans in one transaction.
+
+        Parameters
+        ----------
+            scans: Iterable[:class:`dict`]
+                The decoded ``/market/{id}`` responses.
+        """
+        scans = list(scans)
+        with self._lock, self._db:
+            for data in scans:
+                id, info = data["_id"], data["data"]["scInfo"]
+                self._db.execute("DELETE FROM items WHERE scan_id = ?", (id,))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO scans (id, captured, scan_info) VALUES (?, ?, ?)",
+                    (id, info["capturedTime"], json.dumps(info))
+                )
+                self._db.executemany(
+                    "INSERT INTO items (scan_id, item, data) VALUES (?, ?, ?)",
+                    [(id, item, json.dumps(v)) for item, v in data["data"]["marketInfo"].items()]
+                )
+            self._ids.update(data["_id"] for data in scans)
+
+    def get(self, id: int) -> Optional[dict]:
+        """Get a raw market scan in the shape of the ``/market/{id}`` response.
+
+        Parameters
+        ----------
+            id: :class:`int`
+                The id of the scan.
+
+        Returns
+        -------
+            Optional[:class:`dict`]
+        """
+        if id not in self._ids:
+            return None
+
+        with self._lock:
+            row = self._db.execute("SELECT scan_info FROM scans WHERE id = ?", (id,)).fetchone()
+            items = self._db.execute("SELECT item, data FROM items WHERE scan_id = ?", (id,)).fetchall()
+
+        if row is None:
+            return None
+
+        return {
+            "_id": id,
+            "data": {
+                "scInfo": json.loads(row[0]),
+                "marketInfo": {item: json.loads(data) for item, data in items},
+            },
+        }
+
+    def iter_scans(self) -> Iterator[dict]:
+        """Iterate over every archived scan, oldest first.
+
+        Returns
+        -------
+            Iterator[:class:`dict`]
+                The scans in the shape of the ``/market/{id}`` response.
+        """
+        with self._lock:
+            ids = [row[0] for row in self._db.execute("SELECT id FROM scans ORDER BY captured")]
+
+        for id in ids:
+            data = self.get(id)
+            if data is not None:
+                yield data
+
+    def item_history(self, item: str) -> List[dict]:
+        """Get the raw scans of one item in the shape of the ``/item/{item}/all`` response.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The name of the item.
+
+        Returns
+        -------
+            List[:class:`dict`]
+                The scans of the item, oldest first.
+        """
+        return list(self.iter_item_history(item))
+
+    def iter_item_history(self, item: str) -> Iterator[dict]:
+        """Like :meth:`item_history`, but decodes one scan at a time."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT scans.id, scans.scan_info, items.data FROM items "
+                "JOIN scans ON scans.id = items.scan_id "
+                "WHERE items.item = ? ORDER BY scans.captured",
+                (item,)
+            ).fetchall()
+
+        for id, info, data in rows:
+            yield {"_id": id, "data": {"scInfo": json.loads(info), "marketInfo": {item: json.loads(data)}}}
+
+    def ids(self) -> Set[int]:
+        """Set[:class:`int`]: The ids of every archived scan."""
+        return set(self._ids)
+
+    def mark_synced(self, when: Optional[float] = None) -> None:
+        """Record that the archive holds every scan published up to ``when``.
+
+        Parameters
+        ----------
+            when: Optional[:class:`float`]
+                The UNIX timestamp of the sync. Defaults to now.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('synced', ?)",
+                (str(time.time() if when is None else when),)
+            )
+
+    @property
+    def synced(self) -> Union[float, None]:
+        """Optional[:class:`float`]: The UNIX timestamp of the last complete sync."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'synced'").fetchone()
+        return float(row[0]) if row else None
+
+    @property
+    def path(self) -> str:
+        """:class:`str`: The path of the database file."""
+        return self._path
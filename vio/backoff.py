@@ -0,0 +1,92 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import random
+
+__all__ = (
+    "Backoff",
+)
+
+
+class Backoff:
+    """Exponential backoff with jitter.
+
+    Every call to :meth:`next` returns the current delay and multiplies it by
+    ``factor``, up to ``maximum``. The returned delay is randomly shortened by
+    up to ``jitter`` of its length, so ``jitter=1.0`` gives full jitter.
+
+    Parameters
+    ----------
+        initial: :class:`float`
+            The first delay in seconds.
+
+        maximum: :class:`float`
+            The longest delay in seconds.
+
+        factor: :class:`float`
+            How much the delay grows after every attempt.
+
+        jitter: :class:`float`
+            The fraction of the delay that is randomized, between ``0`` and ``1``.
+    """
+
+    __slots__ = ("_initial", "_maximum", "_factor", "_jitter", "_current", "_attempts")
+
+    def __init__(self, initial: float = 1.0, maximum: float = 60.0, factor: float = 2.0, jitter: float = 0.1) -> None:
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self._initial: float = initial
+        self._maximum: float = maximum
+        self._factor: float = factor
+        self._jitter: float = jitter
+        self._current: float = initial
+        self._attempts: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self._initial=},{self._maximum=},{self._factor=},{self.attempts=})>"
+
+    def next(self) -> float:
+        """Get the delay before the next attempt.
+
+        Returns
+        -------
+            :class:`float`
+                The delay in seconds.
+        """
+        delay = self._current
+        self._current = min(self._current * self._factor, self._maximum)
+        self._attempts += 1
+        return delay * (1 - self._jitter * random.random())
+
+    def reset(self) -> None:
+        """Start over from the initial delay, e.g. after a success."""
+        self._current = self._initial
+        self._attempts = 0
+
+    @property
+    def attempts(self) -> int:
+        """:class:`int`: The amount of delays handed out since the last reset"""
+        return self._attempts
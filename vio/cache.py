@@ -0,0 +1,366 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+    List,
+    Dict
+)
+
+if TYPE_CHECKING:
+    from .Vio import MarketInstance, RobloxUser
+
+__all__ = (
+    "UserCache",
+    "MarketCache",
+)
+
+# Rough per-object costs used to estimate the memory held by a cached market.
+_MARKET_BYTES = 2048
+_ITEM_BYTES = 1536
+_LISTING_BYTES = 256
+
+
+def _market_size(market: "MarketInstance") -> int:
+    # Lazy markets keep their decoded payload, so count from that instead of
+    # materializing every item.
+    if market._raw is not None:
+        items = market._raw.values()
+        listings = sum(len(i["listings"]["buy"]) + len(i["listings"]["sell"]) for i in items)
+    else:
+        items = market.items.values()
+        listings = sum(len(i.listings.buy) + len(i.listings.sell) for i in items)
+    return _MARKET_BYTES + len(items) * _ITEM_BYTES + listings * _LISTING_BYTES
+
+
+def _to_unix(when: Union[int, datetime]) -> int:
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return int(when.timestamp())
+    return int(when)
+
+
+class UserCache:
+    """A bounded cache of :class:`RobloxUser` objects keyed by vendor id.
+
+    Entries expire ``ttl`` seconds after they were stored, and the least
+    recently used entry is evicted once the cache holds ``maxsize`` users.
+
+    Parameters
+    ----------
+        maxsize: :class:`int`
+            The maximum amount of users to keep. ``0`` disables the cache.
+
+        ttl: Optional[:class:`float`]
+            The amount of seconds a user stays valid. ``None`` never expires.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = 600.0) -> None:
+        self._maxsize: int = maxsize
+        self._ttl: Optional[float] = ttl
+        self._data: "OrderedDict[int, Tuple[float, RobloxUser]]" = OrderedDict()
+        self._hits: int = 0
+        self._misses: int = 0
+        # The thread pools of Vio.market_scans share the cache.
+        self._lock: threading.RLock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.maxsize=},{self.ttl=},{self.hits=},{self.misses=})>"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, id: int) -> bool:
+        with self._lock:
+            entry = self._data.get(id)
+            return entry is not None and not self._expired(entry[0])
+
+    def _expired(self, stored: float) -> bool:
+        return self._ttl is not None and time.monotonic() - stored > self._ttl
+
+    def get(self, id: int) -> Optional["RobloxUser"]:
+        """Get a cached user, or ``None`` if it is missing or expired.
+
+        Parameters
+        ----------
+            id: :class:`int`
+                The vendor id of the user.
+        """
+        with self._lock:
+            entry = self._data.get(id)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    del self._data[id]
+                self._misses += 1
+                return None
+
+            self._data.move_to_end(id)
+            self._hits += 1
+            return entry[1]
+
+    def get_many(self, ids: Iterable[int]) -> Tuple[Dict[int, "RobloxUser"], List[int]]:
+        """Split vendor ids into the cached users and the ids still to fetch.
+
+        Parameters
+        ----------
+            ids: Iterable[:class:`int`]
+                The vendor ids to look up. Duplicates are only looked up once.
+
+        Returns
+        -------
+            Tuple[Dict[:class:`int`, :class:`RobloxUser`], List[:class:`int`]]
+        """
+        found: Dict[int, "RobloxUser"] = {}
+        missing: List[int] = []
+        with self._lock:
+            for id in dict.fromkeys(ids):
+                user = self.get(id)
+                if user is None:
+                    missing.append(id)
+                else:
+                    found[id] = user
+        return found, missing
+
+    def put(self, user: "RobloxUser") -> None:
+        """Store a user, evicting the least recently used one if full.
+
+        Parameters
+        ----------
+            user: :class:`RobloxUser`
+                The user to store.
+        """
+        if self._maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[user.id] = (time.monotonic(), user)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every user and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """:class:`int`: The maximum amount of users kept."""
+        return self._maxsize
+
+    @property
+    def ttl(self) -> Optional[float]:
+        """Optional[:class:`float`]: The amount of seconds a user stays valid."""
+        return self._ttl
+
+    @property
+    def hits(self) -> int:
+        """:class:`int`: The amount of lookups served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """:class:`int`: The amount of lookups that were missing or expired."""
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        """:class:`float`: The ratio of lookups served from the cache."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+
+
+class MarketCache:
+    """A bounded cache of :class:`MarketInstance` objects keyed by scan id.
+
+    The least recently used scan is evicted once the cache holds ``maxsize``
+    scans, or once the estimated memory of the cached scans exceeds ``max_bytes``.
+
+    Parameters
+    ----------
+        maxsize: :class:`int`
+            The maximum amount of scans to keep. ``0`` disables the cache.
+
+        max_bytes: Optional[:class:`int`]
+            The approximate memory budget in bytes. ``None`` means no budget.
+    """
+
+    def __init__(self, maxsize: int = 64, max_bytes: Optional[int] = None) -> None:
+        self._maxsize: int = maxsize
+        self._max_bytes: Optional[int] = max_bytes
+        self._data: "OrderedDict[int, Tuple[int, MarketInstance]]" = OrderedDict()
+        self._times: Dict[int, int] = {}
+        self._nbytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._lock: threading.RLock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.maxsize=},{self.max_bytes=},{self.nbytes=},{self.hits=},{self.misses=})>"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._data
+
+    def get(self, id: int) -> Optional["MarketInstance"]:
+        """Get a cached scan by its id.
+
+        Parameters
+        ----------
+            id: :class:`int`
+                The id of the scan.
+
+        Returns
+        -------
+            Optional[:class:`MarketInstance`]
+        """
+        with self._lock:
+            entry = self._data.get(id)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._data.move_to_end(id)
+            self._hits += 1
+            return entry[1]
+
+    def get_by_time(self, when: Union[int, datetime]) -> Optional["MarketInstance"]:
+        """Get a cached scan by the time it was captured.
+
+        Parameters
+        ----------
+            when: Union[:class:`int`, :class:`datetime`]
+                The UNIX timestamp or datetime of the scan.
+                Naive datetimes are treated as UTC.
+
+        Returns
+        -------
+            Optional[:class:`MarketInstance`]
+        """
+        unix = _to_unix(when)
+        with self._lock:
+            id = self._times.get(unix)
+            if id is None:
+                self._misses += 1
+                return None
+            return self.get(id)
+
+    def put(self, market: "MarketInstance") -> None:
+        """Store a scan, evicting the least recently used ones if over budget.
+
+        Parameters
+        ----------
+            market: :class:`MarketInstance`
+                The scan to store.
+        """
+        if self._maxsize <= 0:
+            return
+
+        size = _market_size(market)
+        with self._lock:
+            self.remove(market.id)
+            self._data[market.id] = (size, market)
+            self._times[market.scan_info.unix] = market.id
+            self._nbytes += size
+
+            while len(self._data) > 1 and (
+                len(self._data) > self._maxsize
+                or (self._max_bytes is not None and self._nbytes > self._max_bytes)
+            ):
+                self.remove(next(iter(self._data)))
+
+    def remove(self, id: int) -> None:
+        """Remove a scan from the cache if present.
+
+        Parameters
+        ----------
+            id: :class:`int`
+                The id of the scan.
+        """
+        with self._lock:
+            entry = self._data.pop(id, None)
+            if entry is None:
+                return
+
+            self._nbytes -= entry[0]
+            unix = entry[1].scan_info.unix
+            if self._times.get(unix) == id:
+                del self._times[unix]
+
+    def clear(self) -> None:
+        """Remove every scan and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._times.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """:class:`int`: The maximum amount of scans kept."""
+        return self._maxsize
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """Optional[:class:`int`]: The approximate memory budget in bytes."""
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """:class:`int`: The estimated memory held by the cached scans."""
+        return self._nbytes
+
+    @property
+    def hits(self) -> int:
+        """:class:`int`: The amount of lookups served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """:class:`int`: The amount of lookups that were not cached."""
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        """:class:`float`: The ratio of lookups served from the cache."""
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
@@ -0,0 +1,253 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Tuple,
+    List,
+    Dict
+)
+
+if TYPE_CHECKING:
+    from .Vio import ItemInstance, Listing, MarketInstance
+
+__all__ = (
+    "ListingsDelta",
+    "ItemDelta",
+    "diff_items",
+    "diff_markets",
+)
+
+
+def _key(listing: "Listing") -> Tuple[int, float]:
+    return listing.id, listing.price
+
+
+def _raw_item(market: "MarketInstance", item: str) -> Optional[dict]:
+    return market._raw.get(item) if market._raw is not None else None
+
+
+def _item_names(market: "MarketInstance") -> List[str]:
+    return list(market._raw) if market._raw is not None else list(market.items)
+
+
+class ListingsDelta:
+    """Represents the change of one side of an item's listings between two scans.
+
+    Listings are matched by vendor id and price, so a vendor moving their
+    price shows up as one removed and one added listing.
+
+    Parameters
+    ----------
+        previous: List[:class:`Listing`]
+            The listings of the previous scan.
+
+        current: List[:class:`Listing`]
+            The listings of the current scan.
+    """
+
+    __slots__ = ("_added", "_removed", "_changed")
+
+    def __init__(self, previous: List["Listing"], current: List["Listing"]) -> None:
+        before = {_key(l): l for l in previous}
+        after = {_key(l): l for l in current}
+
+        self._added: List["Listing"] = [l for k, l in after.items() if k not in before]
+        self._removed: List["Listing"] = [l for k, l in before.items() if k not in after]
+        self._changed: List[Tuple["Listing", "Listing"]] = [
+            (before[k], l) for k, l in after.items()
+            if k in before and before[k].volume != l.volume
+        ]
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.added=},{self.removed=},{self.changed=})>"
+
+    def __bool__(self) -> bool:
+        return bool(self._added or self._removed or self._changed)
+
+    @property
+    def added(self) -> List["Listing"]:
+        """List[:class:`Listing`]: The listings that appeared"""
+        return self._added
+
+    @property
+    def removed(self) -> List["Listing"]:
+        """List[:class:`Listing`]: The listings that disappeared"""
+        return self._removed
+
+    @property
+    def changed(self) -> List[Tuple["Listing", "Listing"]]:
+        """List[Tuple[:class:`Listing`, :class:`Listing`]]: The previous and current listing of every volume change"""
+        return self._changed
+
+
+class ItemDelta:
+    """Represents the change of an item between two scans.
+
+    Parameters
+    ----------
+        item: :class:`str`
+            The name of the item.
+
+        previous: Optional[:class:`ItemInstance`]
+            The item in the previous scan, ``None`` if it is new.
+
+        current: Optional[:class:`ItemInstance`]
+            The item in the current scan, ``None`` if it disappeared.
+    """
+
+    __slots__ = ("_item", "_previous", "_current", "_buy", "_sell")
+
+    def __init__(self, item: str, previous: Optional["ItemInstance"], current: Optional["ItemInstance"]) -> None:
+        self._item: str = item
+        self._previous: Optional["ItemInstance"] = previous
+        self._current: Optional["ItemInstance"] = current
+        self._buy: ListingsDelta = ListingsDelta(
+            previous.listings.buy if previous else [],
+            current.listings.buy if current else []
+        )
+        self._sell: ListingsDelta = ListingsDelta(
+            previous.listings.sell if previous else [],
+            current.listings.sell if current else []
+        )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.item=},{self.buy_price_change=},{self.sell_price_change=},{self.buy=},{self.sell=})>"
+
+    def __bool__(self) -> bool:
+        return bool(
+            self._buy or self._sell
+            or self.buy_price_change or self.sell_price_change
+            or self.buy_volume_change or self.sell_volume_change
+        )
+
+    def _change(self, attribute: str) -> float:
+        before = getattr(self._previous.summary, attribute) if self._previous else 0
+        after = getattr(self._current.summary, attribute) if self._current else 0
+        return after - before
+
+    @property
+    def item(self) -> str:
+        """:class:`str`: The name of the item"""
+        return self._item
+
+    @property
+    def previous(self) -> Optional["ItemInstance"]:
+        """Optional[:class:`ItemInstance`]: The item in the previous scan"""
+        return self._previous
+
+    @property
+    def current(self) -> Optional["ItemInstance"]:
+        """Optional[:class:`ItemInstance`]: The item in the current scan"""
+        return self._current
+
+    @property
+    def buy(self) -> ListingsDelta:
+        """:class:`ListingsDelta`: The change of the buy listings"""
+        return self._buy
+
+    @property
+    def sell(self) -> ListingsDelta:
+        """:class:`ListingsDelta`: The change of the sell listings"""
+        return self._sell
+
+    @property
+    def buy_price_change(self) -> float:
+        """:class:`float`: The move of the best buy price"""
+        return self._change("buy_price")
+
+    @property
+    def sell_price_change(self) -> float:
+        """:class:`float`: The move of the best sell price"""
+        return self._change("sell_price")
+
+    @property
+    def buy_volume_change(self) -> int:
+        """:class:`int`: The change of the buy volume"""
+        return self._change("buy_volume")
+
+    @property
+    def sell_volume_change(self) -> int:
+        """:class:`int`: The change of the sell volume"""
+        return self._change("sell_volume")
+
+
+def diff_items(item: str, previous: Optional["MarketInstance"], current: "MarketInstance") -> Optional[ItemDelta]:
+    """Compare one item between two scans.
+
+    Parameters
+    ----------
+        item: :class:`str`
+            The name of the item.
+
+        previous: Optional[:class:`MarketInstance`]
+            The previous scan, ``None`` to treat the item as new.
+
+        current: :class:`MarketInstance`
+            The current scan.
+
+    Returns
+    -------
+        Optional[:class:`ItemDelta`]
+            The change of the item, or ``None`` if it did not change.
+    """
+    if previous is not None:
+        # Lazy markets can be compared on their decoded data, which avoids
+        # building the items that did not change.
+        before, after = _raw_item(previous, item), _raw_item(current, item)
+        if before is not None and before == after:
+            return None
+
+    delta = ItemDelta(item, previous[item] if previous is not None else None, current[item])
+    return delta if delta else None
+
+
+def diff_markets(previous: Optional["MarketInstance"], current: "MarketInstance") -> Dict[str, ItemDelta]:
+    """Compare every item between two scans.
+
+    Parameters
+    ----------
+        previous: Optional[:class:`MarketInstance`]
+            The previous scan, ``None`` to treat every item as new.
+
+        current: :class:`MarketInstance`
+            The current scan.
+
+    Returns
+    -------
+        Dict[:class:`str`, :class:`ItemDelta`]
+            The change of every item that changed.
+    """
+    names = dict.fromkeys(_item_names(current))
+    if previous is not None:
+        names.update(dict.fromkeys(_item_names(previous)))
+
+    deltas = {}
+    for item in names:
+        delta = diff_items(item, previous, current)
+        if delta is not None:
+            deltas[item] = delta
+    return deltas
@@ -0,0 +1,305 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+
+from collections import deque
+from enum import Enum
+
+from typing import (
+    Any,
+    Coroutine,
+    Deque,
+    Hashable,
+    Optional,
+    Tuple,
+    Dict
+)
+
+__all__ = (
+    "Overflow",
+    "HandlerQueue",
+    "Dispatcher",
+)
+
+
+class Overflow(Enum):
+    """What a :class:`HandlerQueue` does when an update arrives while it is full."""
+
+    #: Wait until the handler catches up. No update is lost.
+    block = "block"
+    #: Drop the oldest pending update.
+    drop_oldest = "drop_oldest"
+    #: Replace the pending update with the same key (e.g. the same item) with the newest one.
+    latest = "latest"
+
+
+class HandlerQueue:
+    """A bounded queue of pending updates in front of one handler.
+
+    A worker task calls the handler with one update at a time, so a slow
+    handler only delays its own updates.
+
+    Parameters
+    ----------
+        coro: Coroutine
+            The coroutine function to call with every update.
+
+        maxsize: :class:`int`
+            The maximum amount of pending updates.
+
+        overflow: :class:`Overflow`
+            What to do when an update arrives while the queue is full.
+    """
+
+    def __init__(self, coro: Coroutine, maxsize: int = 64, overflow: Overflow = Overflow.block) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self._coro: Coroutine = coro
+        self._maxsize: int = maxsize
+        self._overflow: Overflow = Overflow(overflow)
+        self._pending: Deque[Tuple[float, Hashable, Any]] = deque()
+        self._condition: asyncio.Condition = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: int = 0
+
+        self._processed: int = 0
+        self._dropped: int = 0
+        self._errors: int = 0
+        self._lag: float = 0.0
+        self._max_lag: float = 0.0
+        self._busy: float = 0.0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.name=},{self.qsize=},{self.processed=},{self.dropped=},{self.lag=})>"
+
+    def start(self) -> None:
+        """Start the worker task if it is not running."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._work())
+
+    async def stop(self) -> None:
+        """Cancel the worker task. Pending updates are kept."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def put(self, update: Any, key: Hashable = None) -> None:
+        """Queue an update for the handler.
+
+        Parameters
+        ----------
+            update: Any
+                The argument to call the handler with.
+
+            key: Hashable
+                Updates with the same key replace each other under :attr:`Overflow.latest`.
+        """
+        loop = asyncio.get_event_loop()
+        async with self._condition:
+            if self._overflow is Overflow.latest:
+                for i, (_, pending_key, _) in enumerate(self._pending):
+                    if pending_key == key:
+                        del self._pending[i]
+                        self._dropped += 1
+                        break
+
+            if len(self._pending) >= self._maxsize:
+                if self._overflow is Overflow.block:
+                    await self._condition.wait_for(lambda: len(self._pending) < self._maxsize)
+                else:
+                    self._pending.popleft()
+                    self._dropped += 1
+
+            self._pending.append((loop.time(), key, update))
+            self._condition.notify_all()
+
+    async def join(self) -> None:
+        """Wait until every pending update was handled."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._pending and not self._inflight)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._pending)
+                queued, _, update = self._pending.popleft()
+                self._inflight += 1
+                self._condition.notify_all()
+
+            started = loop.time()
+            self._lag = started - queued
+            self._max_lag = max(self._max_lag, self._lag)
+            try:
+                await self._coro(update)
+            except Exception as e:
+                self._errors += 1
+                loop.call_exception_handler({
+                    "message": f"Unhandled exception in event handler {self.name}",
+                    "exception": e,
+                })
+            finally:
+                self._inflight -= 1
+            self._busy += loop.time() - started
+            self._processed += 1
+
+            # join waits for the handler to return, not just for the queue to empty.
+            async with self._condition:
+                self._condition.notify_all()
+
+    @property
+    def name(self) -> str:
+        """:class:`str`: The name of the handler"""
+        return getattr(self._coro, "__qualname__", repr(self._coro))
+
+    @property
+    def maxsize(self) -> int:
+        """:class:`int`: The maximum amount of pending updates"""
+        return self._maxsize
+
+    @property
+    def overflow(self) -> Overflow:
+        """:class:`Overflow`: What happens when the queue is full"""
+        return self._overflow
+
+    @property
+    def qsize(self) -> int:
+        """:class:`int`: The amount of pending updates"""
+        return len(self._pending)
+
+    @property
+    def processed(self) -> int:
+        """:class:`int`: The amount of updates handled"""
+        return self._processed
+
+    @property
+    def dropped(self) -> int:
+        """:class:`int`: The amount of updates dropped or replaced on overflow"""
+        return self._dropped
+
+    @property
+    def errors(self) -> int:
+        """:class:`int`: The amount of updates the handler raised on"""
+        return self._errors
+
+    @property
+    def lag(self) -> float:
+        """:class:`float`: The seconds the last handled update waited in the queue"""
+        return self._lag
+
+    @property
+    def max_lag(self) -> float:
+        """:class:`float`: The longest seconds an update waited in the queue"""
+        return self._max_lag
+
+    @property
+    def busy(self) -> float:
+        """:class:`float`: The total seconds spent inside the handler"""
+        return self._busy
+
+
+class Dispatcher:
+    """Hands updates to a :class:`HandlerQueue` per handler without waiting for the handlers.
+
+    Parameters
+    ----------
+        maxsize: :class:`int`
+            The default maximum amount of pending updates per handler.
+
+        overflow: :class:`Overflow`
+            The default overflow policy.
+    """
+
+    def __init__(self, maxsize: int = 64, overflow: Overflow = Overflow.block) -> None:
+        self._maxsize: int = maxsize
+        self._overflow: Overflow = Overflow(overflow)
+        self._options: Dict[Coroutine, Tuple[int, Overflow]] = {}
+        self._queues: Dict[Coroutine, HandlerQueue] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({list(self._queues.values())=})>"
+
+    def configure(self, coro: Coroutine, maxsize: Optional[int] = None, overflow: Optional[Overflow] = None) -> None:
+        """Set the queue size or overflow policy of one handler.
+
+        Parameters
+        ----------
+            coro: Coroutine
+                The handler.
+
+            maxsize: Optional[:class:`int`]
+                The maximum amount of pending updates. Defaults to the dispatcher's.
+
+            overflow: Optional[:class:`Overflow`]
+                The overflow policy. Defaults to the dispatcher's.
+        """
+        self._options[coro] = (
+            maxsize if maxsize is not None else self._maxsize,
+            Overflow(overflow) if overflow is not None else self._overflow
+        )
+
+    def queue(self, coro: Coroutine) -> HandlerQueue:
+        """Get the queue of a handler, creating and starting it if needed."""
+        queue = self._queues.get(coro)
+        if queue is None:
+            maxsize, overflow = self._options.get(coro, (self._maxsize, self._overflow))
+            queue = self._queues[coro] = HandlerQueue(coro, maxsize, overflow)
+        queue.start()
+        return queue
+
+    async def submit(self, coro: Coroutine, update: Any, key: Hashable = None) -> None:
+        """Queue an update for a handler.
+
+        Parameters
+        ----------
+            coro: Coroutine
+                The handler.
+
+            update: Any
+                The argument to call the handler with.
+
+            key: Hashable
+                The conflation key of the update.
+        """
+        await self.queue(coro).put(update, key)
+
+    async def join(self) -> None:
+        """Wait until every handler has caught up."""
+        await asyncio.gather(*[queue.join() for queue in self._queues.values()])
+
+    async def close(self) -> None:
+        """Stop every worker task."""
+        await asyncio.gather(*[queue.stop() for queue in self._queues.values()])
+
+    @property
+    def queues(self) -> Dict[str, HandlerQueue]:
+        """Dict[:class:`str`, :class:`HandlerQueue`]: The queue of every handler that received an update, by name"""
+        return {queue.name: queue for queue in self._queues.values()}
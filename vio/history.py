@@ -0,0 +1,372 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+    List
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from .Vio import ItemInstance
+
+__all__ = (
+    "ItemHistory",
+)
+
+_COLUMNS = (
+    "timestamps",
+    "buy_price",
+    "sell_price",
+    "buy_volume",
+    "sell_volume",
+    "buy_depth",
+    "sell_depth",
+)
+
+_REDUCERS = ("mean", "median", "min", "max", "sum", "first", "last")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("ItemHistory requires numpy, install it with `pip install vio[numpy]`")
+
+
+class ItemHistory:
+    """Represents the scan history of an item as columns of NumPy arrays.
+
+    Every column holds one value per scan, sorted by the time of the scan.
+
+    Parameters
+    ----------
+        item: :class:`str`
+            The name of the item.
+
+        timestamps: :class:`numpy.ndarray`
+            The UNIX timestamps of the scans.
+
+        buy_price, sell_price: :class:`numpy.ndarray`
+            The best buy and sell prices.
+
+        buy_volume, sell_volume: :class:`numpy.ndarray`
+            The total buy and sell volumes.
+
+        buy_depth, sell_depth: :class:`numpy.ndarray`
+            The amount of buy and sell listings.
+    """
+
+    __slots__ = ("_item",) + tuple(f"_{c}" for c in _COLUMNS)
+
+    def __init__(self, item: str, timestamps, buy_price, sell_price, buy_volume, sell_volume, buy_depth, sell_depth) -> None:
+        _require_numpy()
+        self._item: str = item
+
+        order = np.argsort(np.asarray(timestamps, dtype=np.int64), kind="stable")
+        self._timestamps = np.asarray(timestamps, dtype=np.int64)[order]
+        self._buy_price = np.asarray(buy_price, dtype=np.float64)[order]
+        self._sell_price = np.asarray(sell_price, dtype=np.float64)[order]
+        self._buy_volume = np.asarray(buy_volume, dtype=np.float64)[order]
+        self._sell_volume = np.asarray(sell_volume, dtype=np.float64)[order]
+        self._buy_depth = np.asarray(buy_depth, dtype=np.int32)[order]
+        self._sell_depth = np.asarray(sell_depth, dtype=np.int32)[order]
+
+    @classmethod
+    def from_instances(cls, item: str, instances: Iterable["ItemInstance"]) -> "ItemHistory":
+        """Build the history from :class:`ItemInstance` objects.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The name of the item.
+
+            instances: Iterable[:class:`ItemInstance`]
+                The scans of the item.
+        """
+        rows = [
+            (
+                i.scan_info.unix,
+                i.summary.buy_price,
+                i.summary.sell_price,
+                i.summary.buy_volume,
+                i.summary.sell_volume,
+                len(i.listings.buy),
+                len(i.listings.sell),
+            )
+            for i in instances
+        ]
+        return cls(item, *cls._transpose(rows))
+
+    @classmethod
+    def from_payload(cls, item: str, data: List[dict]) -> "ItemHistory":
+        """Build the history straight from a decoded ``/item/{item}/all`` response.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The name of the item.
+
+            data: List[:class:`dict`]
+                The decoded scans of the item.
+        """
+        rows = []
+        for scan in data:
+            info = scan["data"]["marketInfo"][item]
+            buy, sell = info["summary"]["buy"], info["summary"]["sell"]
+            rows.append((
+                scan["data"]["scInfo"]["capturedTime"],
+                buy.get("Best", 0),
+                sell.get("Best", 0),
+                buy.get("Volume", 0),
+                sell.get("Volume", 0),
+                len(info["listings"]["buy"]),
+                len(info["listings"]["sell"]),
+            ))
+        return cls(item, *cls._transpose(rows))
+
+    @staticmethod
+    def _transpose(rows: list) -> list:
+        _require_numpy()
+        if not rows:
+            return [np.empty(0) for _ in _COLUMNS]
+        return list(zip(*rows))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.item=},{len(self)=})>"
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def _column(self, column: str):
+        if column not in _COLUMNS:
+            raise ValueError(f"unknown column {column!r}, expected one of {_COLUMNS}")
+        return getattr(self, f"_{column}")
+
+    def _slice(self, mask) -> "ItemHistory":
+        return ItemHistory(self._item, *(self._column(c)[mask] for c in _COLUMNS))
+
+    def between(self, start: int, end: int) -> "ItemHistory":
+        """Get the scans captured between two UNIX timestamps, inclusive.
+
+        Parameters
+        ----------
+            start: :class:`int`
+                The first timestamp.
+
+            end: :class:`int`
+                The last timestamp.
+
+        Returns
+        -------
+            :class:`ItemHistory`
+        """
+        lo = np.searchsorted(self._timestamps, start, side="left")
+        hi = np.searchsorted(self._timestamps, end, side="right")
+        return self._slice(slice(lo, hi))
+
+    def mean(self, column: str = "buy_price") -> float:
+        """Get the mean of a column.
+
+        Parameters
+        ----------
+            column: :class:`str`
+                The column to use. Defaults to ``"buy_price"``.
+        """
+        return float(np.mean(self._column(column))) if len(self) else float("nan")
+
+    def median(self, column: str = "buy_price") -> float:
+        """Get the median of a column.
+
+        Parameters
+        ----------
+            column: :class:`str`
+                The column to use. Defaults to ``"buy_price"``.
+        """
+        return float(np.median(self._column(column))) if len(self) else float("nan")
+
+    def rolling(self, window: int, column: str = "buy_price", how: str = "mean"):
+        """Apply a function over a rolling window of scans.
+
+        Parameters
+        ----------
+            window: :class:`int`
+                The amount of scans in each window.
+
+            column: :class:`str`
+                The column to use. Defaults to ``"buy_price"``.
+
+            how: :class:`str`
+                One of ``"mean"``, ``"median"``, ``"min"``, ``"max"`` or ``"sum"``.
+
+        Returns
+        -------
+            :class:`numpy.ndarray`
+                One value per full window, ``len(self) - window + 1`` values in total.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        values = self._column(column).astype(np.float64)
+        if len(values) < window:
+            return np.empty(0)
+
+        if how in ("mean", "sum"):
+            cumsum = np.concatenate(([0.0], np.cumsum(values)))
+            sums = cumsum[window:] - cumsum[:-window]
+            return sums / window if how == "mean" else sums
+
+        if how not in ("median", "min", "max"):
+            raise ValueError(f"unknown function {how!r}")
+
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        return getattr(np, how)(windows, axis=1)
+
+    def resample(self, seconds: int, column: str = "buy_price", how: str = "mean") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Group the scans into fixed time buckets.
+
+        Parameters
+        ----------
+            seconds: :class:`int`
+                The width of each bucket in seconds.
+
+            column: :class:`str`
+                The column to use. Defaults to ``"buy_price"``.
+
+            how: :class:`str`
+                One of ``"mean"``, ``"median"``, ``"min"``, ``"max"``, ``"sum"``, ``"first"`` or ``"last"``.
+
+        Returns
+        -------
+            Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+                The start timestamp of every non-empty bucket, and its value.
+        """
+        if seconds < 1:
+            raise ValueError("seconds must be at least 1")
+        if how not in _REDUCERS:
+            raise ValueError(f"unknown function {how!r}")
+
+        values = self._column(column).astype(np.float64)
+        if not len(values):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        buckets = self._timestamps // seconds * seconds
+        starts, first = np.unique(buckets, return_index=True)
+        last = np.append(first[1:], len(values)) - 1
+
+        if how == "first":
+            result = values[first]
+        elif how == "last":
+            result = values[last]
+        elif how == "median":
+            result = np.array([np.median(values[a:b + 1]) for a, b in zip(first, last)])
+        else:
+            ufunc = {"mean": np.add, "sum": np.add, "min": np.minimum, "max": np.maximum}[how]
+            result = ufunc.reduceat(values, first)
+            if how == "mean":
+                result = result / (last - first + 1)
+
+        return starts, result
+
+    def vwap(self, side: str = "buy", window: Optional[int] = None) -> Union[float, "np.ndarray"]:
+        """Get the best price weighted by the listed volume.
+
+        Parameters
+        ----------
+            side: :class:`str`
+                Either ``"buy"`` or ``"sell"``.
+
+            window: Optional[:class:`int`]
+                The amount of scans in a rolling window. When ``None`` the
+                whole history is used and a single value is returned.
+
+        Returns
+        -------
+            Union[:class:`float`, :class:`numpy.ndarray`]
+        """
+        if side not in ("buy", "sell"):
+            raise ValueError("side must be 'buy' or 'sell'")
+
+        price, volume = self._column(f"{side}_price"), self._column(f"{side}_volume")
+        if window is None:
+            total = volume.sum()
+            return float((price * volume).sum() / total) if total else float("nan")
+
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if len(price) < window:
+            return np.empty(0)
+
+        notional = np.concatenate(([0.0], np.cumsum(price * volume)))
+        volumes = np.concatenate(([0.0], np.cumsum(volume)))
+        num = notional[window:] - notional[:-window]
+        den = volumes[window:] - volumes[:-window]
+        return np.divide(num, den, out=np.full(len(num), np.nan), where=den != 0)
+
+    @property
+    def item(self) -> str:
+        """:class:`str`: The name of the item"""
+        return self._item
+
+    @property
+    def timestamps(self):
+        """:class:`numpy.ndarray`: The UNIX timestamps of the scans"""
+        return self._timestamps
+
+    @property
+    def buy_price(self):
+        """:class:`numpy.ndarray`: The best buy price of every scan"""
+        return self._buy_price
+
+    @property
+    def sell_price(self):
+        """:class:`numpy.ndarray`: The best sell price of every scan"""
+        return self._sell_price
+
+    @property
+    def buy_volume(self):
+        """:class:`numpy.ndarray`: The buy volume of every scan"""
+        return self._buy_volume
+
+    @property
+    def sell_volume(self):
+        """:class:`numpy.ndarray`: The sell volume of every scan"""
+        return self._sell_volume
+
+    @property
+    def buy_depth(self):
+        """:class:`numpy.ndarray`: The amount of buy listings of every scan"""
+        return self._buy_depth
+
+    @property
+    def sell_depth(self):
+        """:class:`numpy.ndarray`: The amount of sell listings of every scan"""
+        return self._sell_depth
@@ -0,0 +1,175 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+from typing import (
+    Optional,
+    Tuple,
+    Union,
+    List,
+    Dict,
+    Set
+)
+
+__all__ = (
+    "ScanIndex",
+)
+
+
+def _to_datetime(when: Union[int, float, datetime]) -> datetime:
+    if isinstance(when, datetime):
+        return when if when.tzinfo is not None else when.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(when, timezone.utc)
+
+
+class ScanIndex:
+    """A sorted index of scan ids by the time they were saved.
+
+    Lookups are binary searches, and :meth:`update` only inserts the scans it
+    does not know yet, so the index is never rebuilt. Naive datetimes are
+    treated as UTC and numbers as UNIX timestamps.
+    """
+
+    __slots__ = ("_times", "_ids", "_known")
+
+    def __init__(self) -> None:
+        self._times: List[datetime] = []
+        self._ids: List[int] = []
+        self._known: Set[int] = set()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({len(self)=},{self.latest=})>"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._known
+
+    def update(self, history: Dict[datetime, int]) -> List[int]:
+        """Add the scans of a :meth:`Vio.scan_history` result that are not indexed yet.
+
+        Parameters
+        ----------
+            history: Dict[:class:`datetime`, :class:`int`]
+                The datetimes and ids of the scans.
+
+        Returns
+        -------
+            List[:class:`int`]
+                The ids that were added, oldest first.
+        """
+        new = sorted((_to_datetime(when), id) for when, id in history.items() if id not in self._known)
+        if not new:
+            return []
+
+        if not self._times or new[0][0] >= self._times[-1]:
+            # The common case: every new scan is newer than the ones we know.
+            self._times.extend(when for when, _ in new)
+            self._ids.extend(id for _, id in new)
+        else:
+            for when, id in new:
+                i = bisect_right(self._times, when)
+                self._times.insert(i, when)
+                self._ids.insert(i, id)
+
+        ids = [id for _, id in new]
+        self._known.update(ids)
+        return ids
+
+    def scans_between(
+        self,
+        start: Optional[Union[int, float, datetime]] = None,
+        end: Optional[Union[int, float, datetime]] = None
+    ) -> List[Tuple[datetime, int]]:
+        """Get the scans saved between two times, inclusive.
+
+        Parameters
+        ----------
+            start: Optional[Union[:class:`int`, :class:`datetime`]]
+                The earliest time. ``None`` starts at the oldest scan.
+
+            end: Optional[Union[:class:`int`, :class:`datetime`]]
+                The latest time. ``None`` ends at the newest scan.
+
+        Returns
+        -------
+            List[Tuple[:class:`datetime`, :class:`int`]]
+                The datetimes and ids of the scans, oldest first.
+        """
+        lo = bisect_left(self._times, _to_datetime(start)) if start is not None else 0
+        hi = bisect_right(self._times, _to_datetime(end)) if end is not None else len(self._times)
+        return list(zip(self._times[lo:hi], self._ids[lo:hi]))
+
+    def scan_at(self, when: Union[int, float, datetime]) -> Optional[Tuple[datetime, int]]:
+        """Get the scan saved nearest to a time.
+
+        Parameters
+        ----------
+            when: Union[:class:`int`, :class:`datetime`]
+                The time to look for.
+
+        Returns
+        -------
+            Optional[Tuple[:class:`datetime`, :class:`int`]]
+                The datetime and id of the scan, or ``None`` if the index is empty.
+        """
+        if not self._times:
+            return None
+
+        when = _to_datetime(when)
+        i = bisect_left(self._times, when)
+        if i == len(self._times) or (i > 0 and when - self._times[i - 1] <= self._times[i] - when):
+            i -= 1
+        return self._times[i], self._ids[i]
+
+    def latest_n(self, n: int) -> List[Tuple[datetime, int]]:
+        """Get the newest scans.
+
+        Parameters
+        ----------
+            n: :class:`int`
+                The amount of scans.
+
+        Returns
+        -------
+            List[Tuple[:class:`datetime`, :class:`int`]]
+                The datetimes and ids of the scans, oldest first.
+        """
+        if n <= 0:
+            return []
+        return list(zip(self._times[-n:], self._ids[-n:]))
+
+    @property
+    def latest(self) -> Optional[Tuple[datetime, int]]:
+        """Optional[Tuple[:class:`datetime`, :class:`int`]]: The newest scan"""
+        return (self._times[-1], self._ids[-1]) if self._times else None
+
+    @property
+    def ids(self) -> List[int]:
+        """List[:class:`int`]: The ids of every scan, oldest first"""
+        return list(self._ids)
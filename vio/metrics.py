@@ -0,0 +1,520 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+import time
+import math
+
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+
+from typing import (
+    TYPE_CHECKING,
+    ContextManager,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+    List,
+    Dict,
+    Any
+)
+
+from .ratelimit import endpoint
+
+if TYPE_CHECKING:
+    from .cache import MarketCache, UserCache
+    from .dispatch import Dispatcher
+
+__all__ = (
+    "Histogram",
+    "Metrics",
+)
+
+#: The default histogram bucket bounds, in seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_HELP = {
+    "vio_requests_total": ("counter", "HTTP requests sent, by endpoint, method and status."),
+    "vio_request_seconds": ("histogram", "HTTP request latency until the body was received."),
+    "vio_request_retries_total": ("counter", "HTTP requests retried after a 429 or 5xx."),
+    "vio_request_bytes_total": ("counter", "Bytes of request bodies sent."),
+    "vio_response_bytes_total": ("counter", "Bytes of response bodies received."),
+    "vio_stage_seconds": ("histogram", "Time spent in each stage: decode, build, users and dispatch."),
+    "vio_ws_messages_total": ("counter", "Websocket messages received."),
+    "vio_ws_bytes_total": ("counter", "Bytes of websocket messages received."),
+    "vio_ws_reconnects_total": ("counter", "Websocket connections lost."),
+    "vio_ws_lag_seconds": ("histogram", "Seconds between a scan being captured and it arriving over the websocket."),
+}
+
+_NO_TIMER = nullcontext()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    if extra is not None:
+        labels = labels + (extra,)
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _stage(metrics: Optional["Metrics"], name: str) -> ContextManager:
+    """Time a block as a pipeline stage, or do nothing when ``metrics`` is ``None``.
+
+    Parameters
+    ----------
+        metrics: Optional[:class:`Metrics`]
+            Where to record the time.
+
+        name: :class:`str`
+            The stage, e.g. ``"decode"``.
+    """
+    if metrics is None:
+        return _NO_TIMER
+    return metrics.time("vio_stage_seconds", stage=name)
+
+
+class Histogram:
+    """Counts observations into buckets, like a Prometheus histogram.
+
+    Parameters
+    ----------
+        bounds: Iterable[:class:`float`]
+            The upper bounds of the buckets, in increasing order.
+    """
+
+    __slots__ = ("_bounds", "_counts", "_sum", "_count")
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self._bounds: Tuple[float, ...] = tuple(bounds)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self._sum: float = 0.0
+        self._count: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.count=},{self.sum=})>"
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket.
+
+        Parameters
+        ----------
+            q: :class:`float`
+                The quantile, between ``0`` and ``1``.
+
+        Returns
+        -------
+            :class:`float`
+                ``nan`` without observations.
+        """
+        if not self._count:
+            return math.nan
+        rank = q * self._count
+        seen = 0
+        for i, count in enumerate(self._counts):
+            if seen + count >= rank and count:
+                if i == len(self._bounds):
+                    return self._bounds[-1] if self._bounds else math.nan
+                lower = self._bounds[i - 1] if i else 0.0
+                return lower + (self._bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self._bounds[-1]
+
+    @property
+    def buckets(self) -> List[Tuple[float, int]]:
+        """List[Tuple[:class:`float`, :class:`int`]]: ``(upper bound, cumulative count)`` per bucket, ending with ``inf``"""
+        result = []
+        total = 0
+        for bound, count in zip(self._bounds + (math.inf,), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    @property
+    def count(self) -> int:
+        """:class:`int`: The amount of observations"""
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        """:class:`float`: The sum of all observations"""
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        """:class:`float`: The mean observation, ``nan`` without observations"""
+        return self._sum / self._count if self._count else math.nan
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_labels", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: Labels) -> None:
+        self._metrics = metrics
+        self._name = name
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._metrics._observe(self._name, self._labels, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """Counters and latency histograms of a client.
+
+    Give one to :class:`Vio` or :class:`AsyncVio` with ``metrics=`` to record
+    every request per endpoint, the time spent decoding, building markets,
+    looking up users and dispatching updates, websocket traffic and lag, and
+    the hit rates of the client's caches. Without one nothing is recorded.
+
+    Read the values with :meth:`counter`, :meth:`histogram`, :meth:`snapshot`,
+    or export them with :meth:`render` in the Prometheus text format.
+
+    Parameters
+    ----------
+        buckets: Iterable[:class:`float`]
+            The bucket bounds of every histogram, in seconds.
+
+        window: :class:`float`
+            The seconds over which :attr:`ws_message_rate` is averaged.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, window: float = 60.0) -> None:
+        self._buckets: Tuple[float, ...] = tuple(buckets)
+        self._window: float = window
+        self._lock: threading.Lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._messages: deque = deque()
+        self._caches: Dict[str, Union["UserCache", "MarketCache"]] = {}
+        self._dispatchers: List["Dispatcher"] = []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({list(self._counters)=},{list(self._histograms)=})>"
+
+    def _inc(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self._buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The name of the counter.
+
+            value: :class:`float`
+                The amount to add.
+
+            \\*\\*labels
+                The labels of the series.
+        """
+        self._inc(name, _labels(labels), value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in a histogram.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The name of the histogram.
+
+            value: :class:`float`
+                The value, usually seconds.
+
+            \\*\\*labels
+                The labels of the series.
+        """
+        self._observe(name, _labels(labels), value)
+
+    def time(self, name: str, **labels) -> ContextManager:
+        """Record how long a ``with`` block takes in a histogram.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The name of the histogram.
+
+            \\*\\*labels
+                The labels of the series.
+        """
+        return _Timer(self, name, _labels(labels))
+
+    def record_request(self, method: str, path: str, status: int, seconds: float, sent: int = 0, received: int = 0) -> None:
+        """Record one HTTP request. Clients call this for every attempt.
+
+        Parameters
+        ----------
+            method: :class:`str`
+                The HTTP method.
+
+            path: :class:`str`
+                The path, grouped by :func:`endpoint`.
+
+            status: :class:`int`
+                The status code of the response.
+
+            seconds: :class:`float`
+                The latency of the request.
+
+            sent: :class:`int`
+                The bytes of the request body.
+
+            received: :class:`int`
+                The bytes of the response body.
+        """
+        name = (("endpoint", endpoint(path)),)
+        self._inc("vio_requests_total", name + (("method", method), ("status", str(status))), 1)
+        self._observe("vio_request_seconds", name, seconds)
+        if sent:
+            self._inc("vio_request_bytes_total", name, sent)
+        if received:
+            self._inc("vio_response_bytes_total", name, received)
+
+    def record_message(self, size: int) -> None:
+        """Record one websocket message.
+
+        Parameters
+        ----------
+            size: :class:`int`
+                The size of the message in bytes.
+        """
+        now = time.monotonic()
+        self._inc("vio_ws_messages_total", (), 1)
+        self._inc("vio_ws_bytes_total", (), size)
+        with self._lock:
+            self._messages.append(now)
+            while self._messages[0] < now - self._window:
+                self._messages.popleft()
+
+    def track_cache(self, name: str, cache: Union["UserCache", "MarketCache"]) -> None:
+        """Report the hits and misses of a cache.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The ``cache`` label of its series.
+
+            cache: Union[:class:`UserCache`, :class:`MarketCache`]
+                The cache.
+        """
+        self._caches[name] = cache
+
+    def track_dispatcher(self, dispatcher: "Dispatcher") -> None:
+        """Report the queues of a :class:`Dispatcher`: handled updates, drops, errors, lag and handler time.
+
+        Parameters
+        ----------
+            dispatcher: :class:`Dispatcher`
+                The dispatcher.
+        """
+        if dispatcher not in self._dispatchers:
+            self._dispatchers.append(dispatcher)
+
+    def counter(self, name: str, **labels) -> float:
+        """Get the value of a counter series, ``0`` if it was never incremented.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The name of the counter.
+
+            \\*\\*labels
+                The labels of the series.
+
+        Returns
+        -------
+            :class:`float`
+        """
+        return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        """Get a histogram series.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The name of the histogram.
+
+            \\*\\*labels
+                The labels of the series.
+
+        Returns
+        -------
+            Optional[:class:`Histogram`]
+                ``None`` if nothing was observed.
+        """
+        return self._histograms.get(name, {}).get(_labels(labels))
+
+    def _gauges(self) -> Dict[str, Dict[Labels, float]]:
+        gauges: Dict[str, Dict[Labels, float]] = {}
+
+        def put(name: str, labels: Labels, value: float) -> None:
+            gauges.setdefault(name, {})[labels] = value
+
+        put("vio_ws_messages_per_second", (), self.ws_message_rate)
+
+        for name, cache in self._caches.items():
+            labels = (("cache", name),)
+            put("vio_cache_hits_total", labels, cache.hits)
+            put("vio_cache_misses_total", labels, cache.misses)
+            put("vio_cache_hit_ratio", labels, cache.hit_rate)
+            put("vio_cache_entries", labels, len(cache))
+
+        for dispatcher in self._dispatchers:
+            for handler, queue in dispatcher.queues.items():
+                labels = (("handler", handler),)
+                put("vio_handler_processed_total", labels, queue.processed)
+                put("vio_handler_dropped_total", labels, queue.dropped)
+                put("vio_handler_errors_total", labels, queue.errors)
+                put("vio_handler_busy_seconds_total", labels, queue.busy)
+                put("vio_handler_queue_size", labels, queue.qsize)
+                put("vio_handler_lag_seconds", labels, queue.lag)
+                put("vio_handler_max_lag_seconds", labels, queue.max_lag)
+
+        return gauges
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get every value as plain data, e.g. to log it as JSON.
+
+        Series are keyed by their labels formatted as in :meth:`render`.
+
+        Returns
+        -------
+            Dict[:class:`str`, Any]
+        """
+        with self._lock:
+            counters = {
+                name: {_format_labels(labels): value for labels, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {
+                    _format_labels(labels): {
+                        "count": h.count,
+                        "sum": h.sum,
+                        "p50": h.quantile(0.5),
+                        "p99": h.quantile(0.99),
+                    }
+                    for labels, h in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+        gauges = {
+            name: {_format_labels(labels): value for labels, value in series.items()}
+            for name, series in self._gauges().items()
+        }
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def render(self) -> str:
+        """Render every value in the Prometheus text exposition format.
+
+        Returns
+        -------
+            :class:`str`
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            help = _HELP.get(name)
+            if help is not None:
+                lines.append(f"# HELP {name} {help[1]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                header(name, "counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for labels, h in series.items():
+                    for bound, count in h.buckets:
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(h.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+
+        for name, series in sorted(self._gauges().items()):
+            header(name, "counter" if name.endswith("_total") else "gauge")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget every counter and histogram. Tracked caches and dispatchers keep their own counts."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._messages.clear()
+
+    @property
+    def ws_message_rate(self) -> float:
+        """:class:`float`: Websocket messages per second over the last ``window`` seconds"""
+        with self._lock:
+            now = time.monotonic()
+            while self._messages and self._messages[0] < now - self._window:
+                self._messages.popleft()
+            return len(self._messages) / self._window
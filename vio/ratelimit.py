@@ -0,0 +1,335 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+import time
+import re
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Optional,
+    Tuple,
+    Dict
+)
+
+from .backoff import Backoff
+
+if TYPE_CHECKING:
+    import httpx
+
+__all__ = (
+    "TokenBucket",
+    "RateLimiter",
+    "endpoint",
+)
+
+#: The status codes :class:`RateLimiter` retries by default.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_ITEM_PATH = re.compile(r"^/item/[^/]+")
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint(path: str) -> str:
+    """Get the endpoint a request path belongs to, the key of :meth:`RateLimiter.budget`.
+
+    Ids and item names are replaced by placeholders, so ``/market/12`` becomes
+    ``/market/{id}`` and ``/item/Water/all`` becomes ``/item/{item}/all``.
+
+    Parameters
+    ----------
+        path: :class:`str`
+            The path of a request, without the base url.
+
+    Returns
+    -------
+        :class:`str`
+    """
+    path = path.split("?", 1)[0]
+    path = _ITEM_PATH.sub("/item/{item}", path)
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def _retry_after(response: "httpx.Response") -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """A token bucket that adapts its rate to throttling.
+
+    Tokens refill at ``rate`` per second up to ``burst``. Taking a token never
+    blocks: :meth:`acquire` reserves it and returns how long the caller has to
+    wait, so the same bucket serves threads and coroutines.
+
+    Every :meth:`throttle` halves the rate, down to a sixteenth of ``rate``,
+    and every :meth:`recover` raises it back by a twentieth of ``rate``.
+
+    Parameters
+    ----------
+        rate: :class:`float`
+            The sustained requests per second.
+
+        burst: :class:`int`
+            The most requests that can be sent at once after idling.
+    """
+
+    __slots__ = ("_max_rate", "_rate", "_burst", "_tokens", "_updated", "_paused_until", "_lock")
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self._max_rate: float = rate
+        self._rate: float = rate
+        self._burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.rate=},{self._burst=},{self.tokens=})>"
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._tokens + (now - self._updated) * self._rate, self._burst)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token.
+
+        Returns
+        -------
+            :class:`float`
+                The seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request back for ``seconds``, e.g. for a ``Retry-After``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def throttle(self) -> None:
+        """Halve the rate after the server pushed back."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = max(self._rate / 2, self._max_rate / 16)
+
+    def recover(self) -> None:
+        """Raise the rate a step back towards its configured value after a success."""
+        if self._rate >= self._max_rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = min(self._rate + self._max_rate / 20, self._max_rate)
+
+    @property
+    def rate(self) -> float:
+        """:class:`float`: The current requests per second"""
+        return self._rate
+
+    @property
+    def tokens(self) -> float:
+        """:class:`float`: The tokens left, negative while requests are queued"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RateLimiter:
+    """Paces and retries the requests of a client.
+
+    Every request takes a token from a bucket shared by the whole client and,
+    if its endpoint has a :meth:`budget`, one from the endpoint's bucket.
+    Responses with a status in ``retry_statuses`` are retried up to ``retries``
+    times, after the ``Retry-After`` the server sent or an exponential
+    :class:`Backoff` with jitter, whichever is longer. A 429 also slows the
+    buckets down until requests succeed again.
+
+    One limiter can be shared by several clients using the same key.
+
+    Parameters
+    ----------
+        rate: :class:`float`
+            The sustained requests per second of the client.
+
+        burst: :class:`int`
+            The most requests that can be sent at once after idling.
+
+        budgets: Optional[Dict[:class:`str`, Tuple[:class:`float`, :class:`int`]]]
+            ``(rate, burst)`` per endpoint, see :meth:`budget`.
+
+        retries: :class:`int`
+            How often a request is retried.
+
+        backoff_initial: :class:`float`
+            The first retry delay in seconds.
+
+        backoff_max: :class:`float`
+            The longest retry delay in seconds.
+
+        retry_statuses: Iterable[:class:`int`]
+            The status codes that are retried.
+    """
+
+    __slots__ = ("_bucket", "_budgets", "_retries", "_backoff_initial", "_backoff_max", "_retry_statuses")
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        *,
+        budgets: Optional[Dict[str, Tuple[float, int]]] = None,
+        retries: int = 3,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES
+    ) -> None:
+        self._bucket: TokenBucket = TokenBucket(rate, burst)
+        self._budgets: Dict[str, TokenBucket] = {}
+        self._retries: int = retries
+        self._backoff_initial: float = backoff_initial
+        self._backoff_max: float = backoff_max
+        self._retry_statuses: frozenset = frozenset(retry_statuses)
+
+        for name, (budget_rate, budget_burst) in (budgets or {}).items():
+            self.budget(name, budget_rate, budget_burst)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self._bucket=},{self._retries=},{list(self._budgets)=})>"
+
+    def budget(self, name: str, rate: float, burst: int = 1) -> None:
+        """Limit one endpoint further than the whole client.
+
+        Parameters
+        ----------
+            name: :class:`str`
+                The endpoint, as given by :func:`endpoint`, e.g. ``"/market/{id}"``.
+
+            rate: :class:`float`
+                The sustained requests per second of the endpoint.
+
+            burst: :class:`int`
+                The most requests to the endpoint that can be sent at once.
+        """
+        self._budgets[name] = TokenBucket(rate, burst)
+
+    def acquire(self, path: str) -> float:
+        """Take the tokens for a request.
+
+        Parameters
+        ----------
+            path: :class:`str`
+                The path of the request.
+
+        Returns
+        -------
+            :class:`float`
+                The seconds to wait before sending it.
+        """
+        wait = self._bucket.acquire()
+        bucket = self._budgets.get(endpoint(path))
+        if bucket is not None:
+            wait = max(wait, bucket.acquire())
+        return wait
+
+    def backoff(self) -> Backoff:
+        """Get a fresh :class:`Backoff` for the retries of one request."""
+        return Backoff(self._backoff_initial, self._backoff_max, jitter=0.5)
+
+    def retry_delay(self, path: str, response: "httpx.Response", backoff: Backoff) -> Optional[float]:
+        """Record the outcome of a request and decide whether to retry it.
+
+        Parameters
+        ----------
+            path: :class:`str`
+                The path of the request.
+
+            response: :class:`httpx.Response`
+                The response that was received.
+
+            backoff: :class:`Backoff`
+                The backoff of this request, from :meth:`backoff`.
+
+        Returns
+        -------
+            Optional[:class:`float`]
+                The seconds to wait before retrying, or ``None`` to not retry.
+        """
+        bucket = self._budgets.get(endpoint(path))
+
+        if response.status_code not in self._retry_statuses:
+            self._bucket.recover()
+            if bucket is not None:
+                bucket.recover()
+            return None
+
+        delay = backoff.next()
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if response.status_code == 429:
+            for b in (self._bucket, bucket):
+                if b is not None:
+                    b.throttle()
+                    b.pause(delay)
+
+        if backoff.attempts > self._retries:
+            return None
+        return delay
+
+    @property
+    def bucket(self) -> TokenBucket:
+        """:class:`TokenBucket`: The bucket shared by every request"""
+        return self._bucket
+
+    @property
+    def budgets(self) -> Dict[str, TokenBucket]:
+        """Dict[:class:`str`, :class:`TokenBucket`]: The buckets of the endpoints with a budget"""
+        return dict(self._budgets)
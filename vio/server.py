@@ -0,0 +1,373 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import websockets
+import argparse
+import asyncio
+import random
+import json
+
+from http import HTTPStatus
+from urllib.parse import unquote, urlsplit
+
+from typing import (
+    Optional,
+    Tuple,
+    Union,
+    List,
+    Dict,
+    Set
+)
+
+from .synthetic import RecordedMarket, SyntheticMarket
+
+__all__ = (
+    "VioServer",
+)
+
+_MAX_BODIES = 256
+
+
+class VioServer:
+    """A local stand-in for the Vio API, to test and load-test clients offline.
+
+    Serves ``/market``, ``/market/{id}``, ``/market/history``, ``/items``,
+    ``/item/{item}/all`` and ``/roblox`` over HTTP under ``/api``, and the
+    websocket ``Update`` feed on a second port. Point a client at it with
+    ``base_url=server.base_url`` and ``ws_url=server.ws_url``.
+
+    Scans are published one at a time, ``rate`` per second, like the live
+    service: ``/market`` is the latest published scan, the histories only hold
+    published scans, and every websocket connection gets each new scan.
+
+    Parameters
+    ----------
+        source: Optional[Union[:class:`SyntheticMarket`, :class:`RecordedMarket`]]
+            The data to serve. Defaults to a new :class:`SyntheticMarket`.
+
+        host: :class:`str`
+            The address to listen on.
+
+        port: :class:`int`
+            The HTTP port. ``0`` picks a free one.
+
+        ws_port: :class:`int`
+            The websocket port. ``0`` picks a free one.
+
+        latency: :class:`float`
+            The seconds every HTTP response is delayed by.
+
+        jitter: :class:`float`
+            Up to this many seconds are randomly added to ``latency``.
+
+        rate: :class:`float`
+            The scans published per second. ``0`` publishes none after the start.
+
+        published: Optional[:class:`int`]
+            The amount of scans published at the start. Defaults to every scan
+            if ``rate`` is ``0``, else the first one.
+    """
+
+    def __init__(
+        self,
+        source: Optional[Union[SyntheticMarket, RecordedMarket]] = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ws_port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate: float = 1.0,
+        published: Optional[int] = None
+    ) -> None:
+        self.source: Union[SyntheticMarket, RecordedMarket] = source if source is not None else SyntheticMarket()
+        self.host: str = host
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.rate: float = rate
+
+        self._port: int = port
+        self._ws_port: int = ws_port
+        self._ids: List[int] = list(self.source.ids())
+        if published is None:
+            published = len(self._ids) if rate <= 0 else 1
+        self._count: int = min(published, len(self._ids))
+        self._published: Set[int] = set(self._ids[:self._count])
+
+        self._bodies: Dict[Tuple[str, str], bytes] = {}
+        self._requests: int = 0
+        self._connections: Set = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._http: Optional[asyncio.AbstractServer] = None
+        self._ws = None
+        self._clock: Optional[asyncio.Task] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.base_url=},{self.ws_url=},{self.latest=},{self.requests=})>"
+
+    async def __aenter__(self) -> "VioServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start listening and publishing."""
+        self._http = await asyncio.start_server(self._serve_http, self.host, self._port)
+        self._port = self._http.sockets[0].getsockname()[1]
+        self._ws = await websockets.serve(self._serve_ws, self.host, self._ws_port)
+        self._ws_port = next(iter(self._ws.sockets)).getsockname()[1]
+        if self.rate > 0:
+            self._clock = asyncio.ensure_future(self._publish_forever())
+
+    async def close(self) -> None:
+        """Stop the server and drop every connection."""
+        if self._clock is not None:
+            self._clock.cancel()
+            self._clock = None
+        if self._ws is not None:
+            self._ws.close()
+            await self._ws.wait_closed()
+            self._ws = None
+        if self._http is not None:
+            self._http.close()
+            # Keep-alive connections outlive the listener, so cancel their handlers too.
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._http.wait_closed()
+            self._http = None
+
+    def publish(self) -> Optional[int]:
+        """Publish the next scan now and send it to every websocket.
+
+        Returns
+        -------
+            Optional[:class:`int`]
+                The id of the scan, ``None`` once every scan was published.
+        """
+        if self._count >= len(self._ids):
+            return None
+
+        id = self._ids[self._count]
+        self._count += 1
+        self._published.add(id)
+        self._bodies.clear()
+        websockets.broadcast(self._connections, json.dumps(self.source.update(id)))
+        return id
+
+    async def _publish_forever(self) -> None:
+        while True:
+            await asyncio.sleep(1 / self.rate)
+            if self.publish() is None:
+                return
+
+    async def _serve_ws(self, socket, path: str) -> None:
+        self._connections.add(socket)
+        try:
+            await socket.wait_closed()
+        finally:
+            self._connections.discard(socket)
+
+    async def _serve_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    method, target, _ = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, b"")
+                    break
+
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                if self.latency or self.jitter:
+                    await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+                self._requests += 1
+                status, payload = self._route(method, unquote(urlsplit(target).path), body)
+                await self._respond(writer, status, payload)
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: bytes) -> None:
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    def _route(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        if not path.startswith("/api/"):
+            return 404, b""
+        parts = path[len("/api/"):].split("/")
+
+        if method == "POST" and parts == ["roblox"]:
+            try:
+                ids = json.loads(body)
+            except ValueError:
+                return 400, b""
+            return 200, json.dumps(self.source.users(ids)).encode()
+
+        if method != "GET":
+            return 405, b""
+
+        key = (path, str(self._count))
+        cached = self._bodies.get(key)
+        if cached is not None:
+            return 200, cached
+
+        try:
+            data = self._get(parts)
+        except (KeyError, ValueError):
+            return 404, b""
+
+        payload = json.dumps(data).encode()
+        if len(self._bodies) >= _MAX_BODIES:
+            self._bodies.clear()
+        self._bodies[key] = payload
+        return 200, payload
+
+    def _get(self, parts: List[str]) -> Union[dict, list]:
+        if parts == ["market"]:
+            if not self._count:
+                raise KeyError("market")
+            return self.source.market(self._ids[self._count - 1])
+
+        if parts == ["market", "history"]:
+            return {k: v for k, v in self.source.scan_history().items() if v in self._published}
+
+        if len(parts) == 2 and parts[0] == "market":
+            id = int(parts[1]) if parts[1].isdigit() else parts[1]
+            if id not in self._published:
+                raise KeyError(id)
+            return self.source.market(id)
+
+        if parts == ["items"]:
+            return self.source.item_names()
+
+        if len(parts) == 3 and parts[0] == "item" and parts[2] == "all":
+            return [s for s in self.source.item_history(parts[1]) if s["_id"] in self._published]
+
+        raise KeyError("/".join(parts))
+
+    @property
+    def base_url(self) -> str:
+        """:class:`str`: The ``base_url`` to give a client, once started"""
+        return f"http://{self.host}:{self._port}/api"
+
+    @property
+    def ws_url(self) -> str:
+        """:class:`str`: The ``ws_url`` to give an :class:`AsyncVio`, once started"""
+        return f"ws://{self.host}:{self._ws_port}/ws"
+
+    @property
+    def latest(self) -> Optional[int]:
+        """Optional[:class:`int`]: The id of the latest published scan"""
+        return self._ids[self._count - 1] if self._count else None
+
+    @property
+    def requests(self) -> int:
+        """:class:`int`: The amount of HTTP requests served"""
+        return self._requests
+
+    @property
+    def connections(self) -> int:
+        """:class:`int`: The amount of open websocket connections"""
+        return len(self._connections)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Vio API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="the HTTP port")
+    parser.add_argument("--ws-port", type=int, default=8081, help="the websocket port")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every HTTP response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many random seconds added to the latency")
+    parser.add_argument("--rate", type=float, default=1.0, help="scans published per second")
+    parser.add_argument("--published", type=int, help="scans published at the start")
+    parser.add_argument("--recorded", help="a JSON file of scans to replay instead of synthetic data")
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--listings", type=int, default=20)
+    parser.add_argument("--vendors", type=int, default=500)
+    parser.add_argument("--history", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.recorded:
+        source = RecordedMarket.from_file(args.recorded)
+    else:
+        source = SyntheticMarket(args.items, args.listings, args.vendors, args.history, args.seed)
+
+    server = VioServer(
+        source,
+        host=args.host,
+        port=args.port,
+        ws_port=args.ws_port,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate=args.rate,
+        published=args.published
+    )
+
+    async def run() -> None:
+        await server.start()
+        print(f"serving {server.base_url} and {server.ws_url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
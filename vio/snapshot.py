@@ -0,0 +1,366 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+import mmap
+import struct
+
+from typing import (
+    Iterable,
+    Iterator,
+    Tuple,
+    List,
+    Dict
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+__all__ = (
+    "LISTING_DTYPE",
+    "SCAN_DTYPE",
+    "RECORD_DTYPE",
+    "SnapshotWriter",
+    "Snapshot",
+    "write_snapshot",
+)
+
+# File layout, every integer little endian:
+#
+#   header    64 bytes, see _HEADER
+#   listings  n_listings * LISTING_DTYPE, grouped by scan then item, buy orders first
+#   scans     n_scans * SCAN_DTYPE, in the order they were written
+#   records   n_records * RECORD_DTYPE, one per item of every scan
+#   names     the item names as a UTF-8 JSON array, until the end of the file
+_MAGIC = b"VIOSNAP1"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+
+if np is not None:
+    LISTING_DTYPE = np.dtype([("vendor", "<u8"), ("volume", "<i8"), ("price", "<f8")])
+    SCAN_DTYPE = np.dtype([("id", "<i8"), ("captured", "<i8")])
+    RECORD_DTYPE = np.dtype([("scan", "<u4"), ("item", "<u4"), ("start", "<u8"), ("buy", "<u4"), ("sell", "<u4")])
+else:  # pragma: no cover
+    LISTING_DTYPE = SCAN_DTYPE = RECORD_DTYPE = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("snapshots require numpy, install it with `pip install vio[numpy]`")
+
+
+class SnapshotWriter:
+    """Writes market scans to a binary snapshot file.
+
+    Listings are stored as fixed width ``(vendor, volume, price)`` records and
+    indexed per scan and item, so :class:`Snapshot` can map the file without
+    parsing it.
+
+    Parameters
+    ----------
+        path: :class:`str`
+            The path of the file to write.
+    """
+
+    def __init__(self, path: str) -> None:
+        _require_numpy()
+        self._path: str = path
+        self._file = open(path, "wb")
+        self._file.write(bytes(_HEADER.size))
+        self._items: Dict[str, int] = {}
+        self._scans: List[Tuple[int, int]] = []
+        self._records: List[Tuple[int, int, int, int, int]] = []
+        self._listings: int = 0
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def add(self, data: dict) -> None:
+        """Append a raw market scan.
+
+        Parameters
+        ----------
+            data: :class:`dict`
+                The decoded ``/market/{id}`` response.
+        """
+        scan = len(self._scans)
+        self._scans.append((data["_id"], data["data"]["scInfo"]["capturedTime"]))
+
+        for name, info in data["data"]["marketInfo"].items():
+            item = self._items.setdefault(name, len(self._items))
+            buy, sell = info["listings"]["buy"], info["listings"]["sell"]
+            rows = np.array(
+                [(o["userID"], o["amount"], o["price"]) for o in buy + sell],
+                dtype=LISTING_DTYPE
+            )
+            self._file.write(rows.tobytes())
+            self._records.append((scan, item, self._listings, len(buy), len(sell)))
+            self._listings += len(rows)
+
+    def add_many(self, scans: Iterable[dict]) -> None:
+        """Append many raw market scans.
+
+        Parameters
+        ----------
+            scans: Iterable[:class:`dict`]
+                The decoded ``/market/{id}`` responses.
+        """
+        for data in scans:
+            self.add(data)
+
+    def close(self) -> None:
+        """Write the index tables and close the file."""
+        if self._file.closed:
+            return
+
+        scans_offset = self._file.tell()
+        self._file.write(np.array(self._scans, dtype=SCAN_DTYPE).tobytes())
+        records_offset = self._file.tell()
+        self._file.write(np.array(self._records, dtype=RECORD_DTYPE).tobytes())
+        names_offset = self._file.tell()
+        self._file.write(json.dumps(list(self._items)).encode())
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(
+            _MAGIC, _VERSION, 0,
+            len(self._scans), len(self._records), self._listings,
+            scans_offset, records_offset, names_offset
+        ))
+        self._file.close()
+
+    @property
+    def path(self) -> str:
+        """:class:`str`: The path of the file."""
+        return self._path
+
+
+def write_snapshot(path: str, scans: Iterable[dict]) -> None:
+    """Write raw market scans to a binary snapshot file.
+
+    Parameters
+    ----------
+        path: :class:`str`
+            The path of the file to write.
+
+        scans: Iterable[:class:`dict`]
+            The decoded ``/market/{id}`` responses, e.g. from :meth:`ScanArchive.iter_scans`.
+    """
+    with SnapshotWriter(path) as writer:
+        writer.add_many(scans)
+
+
+class Snapshot:
+    """A read-only, memory-mapped binary snapshot written by :class:`SnapshotWriter`.
+
+    Every array returned is a view into the mapped file, so processes reading
+    the same file share its pages through the page cache.
+
+    Parameters
+    ----------
+        path: :class:`str`
+            The path of the file to read.
+    """
+
+    def __init__(self, path: str) -> None:
+        _require_numpy()
+        self._path: str = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n_scans, n_records, n_listings, scans_offset, records_offset, names_offset = \
+            _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a vio snapshot")
+        if version != _VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+
+        self._listings = np.frombuffer(self._mmap, LISTING_DTYPE, n_listings, _HEADER.size)
+        self._scans = np.frombuffer(self._mmap, SCAN_DTYPE, n_scans, scans_offset)
+        self._records = np.frombuffer(self._mmap, RECORD_DTYPE, n_records, records_offset)
+        self._items: List[str] = json.loads(self._mmap[names_offset:].decode())
+        self._item_ids: Dict[str, int] = {name: i for i, name in enumerate(self._items)}
+        self._scan_ids: Dict[int, int] = {int(id): i for i, id in enumerate(self._scans["id"])}
+
+        # Records are written scan by scan, so each scan owns a contiguous range.
+        self._scan_records = np.searchsorted(self._records["scan"], np.arange(n_scans + 1))
+        self._item_records: Dict[int, "np.ndarray"] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.path=},{len(self)=},{len(self.items)=})>"
+
+    def __len__(self) -> int:
+        return len(self._scans)
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping of the file.
+
+        The file stays mapped until every view returned by the snapshot is gone.
+        """
+        self._listings = self._scans = self._records = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def _position(self, scan: int, by_id: bool) -> int:
+        if not by_id:
+            return scan
+        try:
+            return self._scan_ids[scan]
+        except KeyError:
+            raise KeyError(f"scan {scan} is not in the snapshot") from None
+
+    def _records_of_item(self, item: str) -> "np.ndarray":
+        index = self._item_ids.get(item)
+        if index is None:
+            raise KeyError(f"item {item!r} is not in the snapshot")
+        if index not in self._item_records:
+            self._item_records[index] = np.flatnonzero(self._records["item"] == index)
+        return self._item_records[index]
+
+    def scan_listings(self, scan: int, by_id: bool = False) -> "np.ndarray":
+        """Get every listing of a scan.
+
+        Parameters
+        ----------
+            scan: :class:`int`
+                The position of the scan, or its id when ``by_id`` is ``True``.
+
+            by_id: :class:`bool`
+                Whether ``scan`` is a scan id.
+
+        Returns
+        -------
+            :class:`numpy.ndarray`
+                A zero-copy view of :data:`LISTING_DTYPE` records.
+        """
+        pos = self._position(scan, by_id)
+        lo, hi = self._scan_records[pos], self._scan_records[pos + 1]
+        if lo == hi:
+            return self._listings[:0]
+        first, last = self._records[lo], self._records[hi - 1]
+        return self._listings[first["start"]:last["start"] + last["buy"] + last["sell"]]
+
+    def item_listings(self, scan: int, item: str, by_id: bool = False) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Get the buy and sell listings of an item in one scan.
+
+        Parameters
+        ----------
+            scan: :class:`int`
+                The position of the scan, or its id when ``by_id`` is ``True``.
+
+            item: :class:`str`
+                The name of the item.
+
+            by_id: :class:`bool`
+                Whether ``scan`` is a scan id.
+
+        Returns
+        -------
+            Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+                Zero-copy views of the buy and sell listings.
+        """
+        pos = self._position(scan, by_id)
+        index = self._item_ids.get(item)
+        records = self._records[self._scan_records[pos]:self._scan_records[pos + 1]]
+        match = np.flatnonzero(records["item"] == index) if index is not None else ()
+        if not len(match):
+            return self._listings[:0], self._listings[:0]
+        record = records[match[0]]
+        start, buy, sell = int(record["start"]), int(record["buy"]), int(record["sell"])
+        return self._listings[start:start + buy], self._listings[start + buy:start + buy + sell]
+
+    def iter_item(self, item: str) -> Iterator[Tuple[int, "np.ndarray", "np.ndarray"]]:
+        """Iterate over the listings of an item in every scan it appears in.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The name of the item.
+
+        Returns
+        -------
+            Iterator[Tuple[:class:`int`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]]
+                The capture time of each scan, with zero-copy views of the buy and sell listings.
+        """
+        captured = self._scans["captured"]
+        for record in self._records[self._records_of_item(item)]:
+            start, buy, sell = int(record["start"]), int(record["buy"]), int(record["sell"])
+            yield (
+                int(captured[record["scan"]]),
+                self._listings[start:start + buy],
+                self._listings[start + buy:start + buy + sell],
+            )
+
+    def item_index(self, item: str) -> "np.ndarray":
+        """Get the index records of an item, one per scan it appears in.
+
+        Parameters
+        ----------
+            item: :class:`str`
+                The name of the item.
+
+        Returns
+        -------
+            :class:`numpy.ndarray`
+                The :data:`RECORD_DTYPE` records of the item.
+        """
+        return self._records[self._records_of_item(item)]
+
+    @property
+    def path(self) -> str:
+        """:class:`str`: The path of the file."""
+        return self._path
+
+    @property
+    def items(self) -> List[str]:
+        """List[:class:`str`]: The names of every item in the snapshot."""
+        return list(self._items)
+
+    @property
+    def scans(self) -> "np.ndarray":
+        """:class:`numpy.ndarray`: The ``(id, captured)`` records of every scan."""
+        return self._scans
+
+    @property
+    def records(self) -> "np.ndarray":
+        """:class:`numpy.ndarray`: The ``(scan, item, start, buy, sell)`` index records."""
+        return self._records
+
+    @property
+    def listings(self) -> "np.ndarray":
+        """:class:`numpy.ndarray`: Every listing in the snapshot."""
+        return self._listings
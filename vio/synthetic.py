@@ -0,0 +1,289 @@
+"""
+MIT License
+
+Copyright (c) 2022 Meaning
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import random
+import json
+
+from datetime import datetime, timezone
+
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Optional,
+    List,
+    Dict
+)
+
+if TYPE_CHECKING:
+    from .archive import ScanArchive
+
+__all__ = (
+    "SyntheticMarket",
+    "RecordedMarket",
+)
+
+
+def _history_key(captured: int) -> str:
+    # The format of the keys of /market/history.
+    return datetime.fromtimestamp(captured, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+class SyntheticMarket:
+    """Deterministic stand-in data for the Vio API, at any scale.
+
+    Every payload is generated on demand from ``seed``, the scan id and the
+    item, so the same arguments always give the same bytes and one item's
+    history can be generated without building whole markets. Prices drift
+    between scans so consecutive scans differ like real ones.
+
+    Used by the benchmarks and :class:`~vio.server.VioServer`.
+
+    Parameters
+    ----------
+        items: :class:`int`
+            The amount of items in a market, named ``Item0``, ``Item1``, ...
+
+        listings: :class:`int`
+            The buy and the sell listings per item.
+
+        vendors: :class:`int`
+            The amount of distinct vendor ids.
+
+        history: :class:`int`
+            The amount of scans, with ids ``1`` to ``history``.
+
+        seed: :class:`int`
+            The seed of every random choice.
+
+        start: :class:`int`
+            The UNIX timestamp of scan ``0``.
+
+        interval: :class:`int`
+            The seconds between scans.
+    """
+
+    def __init__(
+        self,
+        items: int = 50,
+        listings: int = 20,
+        vendors: int = 500,
+        history: int = 100,
+        seed: int = 0,
+        start: int = 1655000000,
+        interval: int = 300
+    ) -> None:
+        self.items: int = items
+        self.listings: int = listings
+        self.vendors: int = vendors
+        self.history: int = history
+        self.seed: int = seed
+        self.start: int = start
+        self.interval: int = interval
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({self.items=},{self.listings=},{self.vendors=},{self.history=},{self.seed=})>"
+
+    def _rng(self, *key: int) -> random.Random:
+        # String seeds are hashed deterministically, unlike tuples.
+        return random.Random(":".join(map(str, (self.seed,) + key)))
+
+    def _item(self, id: int, index: int) -> dict:
+        rng = self._rng(id, index)
+        # A slow drift shared by all scans of the item, plus per-scan noise.
+        mid = 5 + 2 * self._rng(index).random() + 0.01 * (id % 97)
+
+        def orders(low: float, high: float, reverse: bool) -> list:
+            return sorted(
+                (
+                    {"userID": rng.randrange(self.vendors), "amount": rng.randrange(1, 100000), "price": round(rng.uniform(low, high), 2)}
+                    for _ in range(self.listings)
+                ),
+                key=lambda o: o["price"],
+                reverse=reverse
+            )
+
+        buy, sell = orders(mid - 4, mid, True), orders(mid, mid + 4, False)
+        return {
+            "listings": {"buy": buy, "sell": sell},
+            "summary": {
+                "buy": {"Volume": sum(o["amount"] for o in buy), "Best": buy[0]["price"] if buy else 0},
+                "sell": {"Volume": sum(o["amount"] for o in sell), "Best": sell[0]["price"] if sell else 0},
+            },
+        }
+
+    def captured(self, id: int) -> int:
+        """The UNIX timestamp of a scan."""
+        return self.start + id * self.interval
+
+    def scan_info(self, id: int) -> dict:
+        """The ``scInfo`` of a scan."""
+        captured = self.captured(id)
+        saved = datetime.fromtimestamp(captured, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        return {"capturedTime": captured, "datetimeSaved": {"$date": saved}}
+
+    def item_names(self) -> List[str]:
+        """The ``/items`` payload."""
+        return [f"Item{i}" for i in range(self.items)]
+
+    def market(self, id: Optional[int] = None) -> dict:
+        """The ``/market/{id}`` payload, or ``/market`` without an id."""
+        if id is None:
+            id = self.history
+        return {
+            "_id": id,
+            "data": {
+                "scInfo": self.scan_info(id),
+                "marketInfo": {f"Item{i}": self._item(id, i) for i in range(self.items)},
+            },
+        }
+
+    def item_history(self, item: str) -> List[dict]:
+        """The ``/item/{item}/all`` payload.
+
+        Raises
+        ------
+            KeyError
+                The item does not exist.
+        """
+        if not item.startswith("Item") or not item[4:].isdigit() or int(item[4:]) >= self.items:
+            raise KeyError(item)
+        index = int(item[4:])
+        return [
+            {"_id": id, "data": {"scInfo": self.scan_info(id), "marketInfo": {item: self._item(id, index)}}}
+            for id in self.ids()
+        ]
+
+    def scan_history(self) -> Dict[str, int]:
+        """The ``/market/history`` payload."""
+        return {_history_key(self.captured(id)): id for id in self.ids()}
+
+    def update(self, id: int) -> dict:
+        """A websocket ``Update`` message carrying a scan."""
+        return {"Rtype": "Update", "DataType": self.market(id)}
+
+    def user(self, id: int) -> dict:
+        """A ``/roblox`` user."""
+        return roblox_user(id)
+
+    def users(self, ids: Iterable[int]) -> List[dict]:
+        """The ``/roblox`` payload for some vendor ids."""
+        return [roblox_user(id) for id in ids]
+
+    def ids(self) -> range:
+        """The ids of every scan, oldest first."""
+        return range(1, self.history + 1)
+
+
+class RecordedMarket:
+    """Recorded scans in the shape of :class:`SyntheticMarket`, to replay real data.
+
+    Users are not recorded, so ``/roblox`` lookups get generated users.
+
+    Parameters
+    ----------
+        scans: Iterable[:class:`dict`]
+            Scans in the shape of the ``/market/{id}`` response, in any order.
+    """
+
+    def __init__(self, scans: Iterable[dict]) -> None:
+        self._scans: List[dict] = sorted(scans, key=lambda s: s["data"]["scInfo"]["capturedTime"])
+        self._by_id: Dict[int, dict] = {s["_id"]: s for s in self._scans}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__}({len(self._scans)=})>"
+
+    @classmethod
+    def from_archive(cls, archive: "ScanArchive") -> "RecordedMarket":
+        """Replay every scan of a :class:`ScanArchive`."""
+        return cls(archive.iter_scans())
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordedMarket":
+        """Replay a JSON file holding a list of scans."""
+        with open(path, "rb") as f:
+            return cls(json.load(f))
+
+    def item_names(self) -> List[str]:
+        """The ``/items`` payload: every item of any scan."""
+        return list(dict.fromkeys(item for s in self._scans for item in s["data"]["marketInfo"]))
+
+    def market(self, id: Optional[int] = None) -> dict:
+        """The ``/market/{id}`` payload, or ``/market`` without an id.
+
+        Raises
+        ------
+            KeyError
+                The scan was not recorded.
+        """
+        if id is None:
+            return self._scans[-1]
+        return self._by_id[id]
+
+    def item_history(self, item: str) -> List[dict]:
+        """The ``/item/{item}/all`` payload.
+
+        Raises
+        ------
+            KeyError
+                No scan has the item.
+        """
+        history = [
+            {"_id": s["_id"], "data": {"scInfo": s["data"]["scInfo"], "marketInfo": {item: s["data"]["marketInfo"][item]}}}
+            for s in self._scans
+            if item in s["data"]["marketInfo"]
+        ]
+        if not history:
+            raise KeyError(item)
+        return history
+
+    def scan_history(self) -> Dict[str, int]:
+        """The ``/market/history`` payload."""
+        return {_history_key(s["data"]["scInfo"]["capturedTime"]): s["_id"] for s in self._scans}
+
+    def update(self, id: int) -> dict:
+        """A websocket ``Update`` message carrying a scan."""
+        return {"Rtype": "Update", "DataType": self.market(id)}
+
+    def users(self, ids: Iterable[int]) -> List[dict]:
+        """The ``/roblox`` payload for some vendor ids."""
+        return [roblox_user(id) for id in ids]
+
+    def ids(self) -> List[int]:
+        """The ids of every scan, oldest first."""
+        return [s["_id"] for s in self._scans]
+
+
+def roblox_user(id: int) -> dict:
+    return {
+        "_id": id,
+        "name": f"vendor{id}",
+        "displayName": f"Vendor {id}",
+        "roblox_profile": f"https://www.roblox.com/users/{id}/profile",
+        "roblox_tiny_profile": f"https://rblx.co/{id}",
+    }
+
+
+def market(id: int = 1, items: int = 50, listings: int = 20, vendors: int = 500, seed: int = 0) -> dict:
+    """A ``/market`` payload with ``listings`` buy and sell orders per item."""
+    return SyntheticMarket(items, listings, vendors, seed=seed).market(id)